@@ -6,6 +6,7 @@ calls Gemini for reasoning, and surfaces high-risk alerts.
 Leaves the existing orchestrator_agent.py untouched.
 """
 
+import asyncio
 import json
 import os
 import uuid
@@ -15,7 +16,9 @@ from datetime import datetime
 from typing import Dict, Any, List
 
 import pandas as pd
-from google import genai
+
+from agents.gemini_client import get_client
+from services.procurement_service import load_purchase_orders
 
 # ── paths ────────────────────────────────────────────
 BASE = os.path.join(os.path.dirname(__file__), "..", "data_base")
@@ -26,6 +29,13 @@ CHAT_LOG_COLUMNS = [
     "confidence_score", "timestamp"
 ]
 
+# Files under BASE that global state and alerts are built from
+STATE_FILES = (
+    "inventory.csv", "warehouse.csv", "logistics_shipments.csv",
+    "production_orders.csv", "purchase_orders.csv", "po_events.csv",
+    "material_planning.csv", "wip_tracking.csv", "orchestration_log.csv",
+)
+
 
 # ──────────────────────────────────────────────────────
 # SYSTEM PROMPT
@@ -72,13 +82,21 @@ def _read(fname: str) -> pd.DataFrame:
     return pd.DataFrame()
 
 
+def _read_purchase_orders() -> pd.DataFrame:
+    """purchase_orders.csv with the PO status event log applied."""
+    try:
+        return load_purchase_orders(os.path.join(BASE, "purchase_orders.csv"))
+    except Exception:
+        return pd.DataFrame()
+
+
 class CentralOrchestrator:
     """
     Stateless orchestrator — every call re-reads CSVs so state is always fresh.
     """
 
-    def __init__(self, api_key: str, model_name: str = "gemini-2.5-flash"):
-        self.client = genai.Client(api_key=api_key)
+    def __init__(self, api_key: str = "", model_name: str = "gemini-2.5-flash"):
+        self.client = get_client(api_key)
         self.model_name = model_name
         self._ensure_log()
 
@@ -88,7 +106,7 @@ class CentralOrchestrator:
         warehouse = _read("warehouse.csv")
         shipments = _read("logistics_shipments.csv")
         production = _read("production_orders.csv")
-        purchase   = _read("purchase_orders.csv")
+        purchase   = _read_purchase_orders()
         planning   = _read("material_planning.csv")
         wip        = _read("wip_tracking.csv")
         orch_log   = _read("orchestration_log.csv")
@@ -143,7 +161,7 @@ class CentralOrchestrator:
                     pass
 
         # 3. High-risk purchase orders still pending
-        po = _read("purchase_orders.csv")
+        po = _read_purchase_orders()
         if not po.empty:
             for _, r in po.iterrows():
                 rl = str(r.get("risk_level", "")).lower()
@@ -198,10 +216,64 @@ class CentralOrchestrator:
 
     # ── chat handler ──────────────────────────────────
     def answer_query(self, user_query: str) -> Dict[str, Any]:
+        prompt = self._build_prompt(user_query)
+
+        try:
+            # Retry with backoff for free-tier rate limits
+            for attempt in range(3):
+                try:
+                    response = self.client.models.generate_content(
+                        model=self.model_name,
+                        contents=prompt
+                    )
+                    break
+                except Exception:
+                    if attempt == 2:
+                        raise  # all retries failed
+                    time.sleep(35 * (attempt + 1))  # 35s, 70s
+            decision = self._parse_decision(response.text)
+        except Exception as e:
+            decision = self._error_decision(e)
+
+        # log
+        self._log_chat(user_query, decision)
+
+        return decision
+
+    async def answer_query_async(self, user_query: str) -> Dict[str, Any]:
+        """
+        answer_query() with the Gemini call on a worker thread, so backoff
+        doesn't block. The shared sync client is used because each async
+        view runs in a fresh event loop, which the aio transport can't span.
+        """
+        prompt = self._build_prompt(user_query)
+
+        try:
+            for attempt in range(3):
+                try:
+                    response = await asyncio.to_thread(
+                        self.client.models.generate_content,
+                        model=self.model_name,
+                        contents=prompt
+                    )
+                    break
+                except Exception:
+                    if attempt == 2:
+                        raise
+                    await asyncio.sleep(35 * (attempt + 1))
+            decision = self._parse_decision(response.text)
+        except Exception as e:
+            decision = self._error_decision(e)
+
+        self._log_chat(user_query, decision)
+
+        return decision
+
+    def _build_prompt(self, user_query: str) -> str:
         state = self.gather_global_state()
         alerts = self.scan_alerts()
 
-        prompt = f"""{SYSTEM_PROMPT}
+        return f"""{SYSTEM_PROMPT}
 
 CURRENT GLOBAL STATE:
 {json.dumps(state, indent=2, default=str)}
@@ -214,55 +286,37 @@ USER QUERY:
 
 Analyze the state and answer the user's question. Return ONLY valid JSON."""
 
+    @staticmethod
+    def _parse_decision(text: str) -> Dict[str, Any]:
+        raw = text.strip()
+        # strip markdown fences if present
+        if raw.startswith("```"):
+            raw = raw.split("\n", 1)[1]
+            if raw.endswith("```"):
+                raw = raw[:-3]
+            raw = raw.strip()
         try:
-            # Retry with backoff for free-tier rate limits
-            last_err = None
-            for attempt in range(3):
-                try:
-                    response = self.client.models.generate_content(
-                        model=self.model_name,
-                        contents=prompt
-                    )
-                    raw = response.text.strip()
-                    break
-                except Exception as retry_err:
-                    last_err = retry_err
-                    if attempt < 2:
-                        time.sleep(35 * (attempt + 1))  # 35s, 70s
-                    continue
-            else:
-                raise last_err  # all retries failed
-
-            # strip markdown fences if present
-            if raw.startswith("```"):
-                raw = raw.split("\n", 1)[1]
-                if raw.endswith("```"):
-                    raw = raw[:-3]
-                raw = raw.strip()
-            decision = json.loads(raw)
+            return json.loads(raw)
         except json.JSONDecodeError:
-            decision = {
-                "analysis": response.text if 'response' in dir() else "Failed to parse AI response.",
+            return {
+                "analysis": text,
                 "root_cause": None,
                 "affected_entities": [],
                 "risk_level": "UNKNOWN",
                 "recommended_actions": ["Retry the query or rephrase."],
                 "confidence_score": 0.0,
             }
-        except Exception as e:
-            decision = {
-                "analysis": f"Error communicating with AI: {str(e)}",
-                "root_cause": None,
-                "affected_entities": [],
-                "risk_level": "UNKNOWN",
-                "recommended_actions": ["Check API key and network connectivity."],
-                "confidence_score": 0.0,
-            }
 
-        # log
-        self._log_chat(user_query, decision)
-
-        return decision
+    @staticmethod
+    def _error_decision(e: Exception) -> Dict[str, Any]:
+        return {
+            "analysis": f"Error communicating with AI: {str(e)}",
+            "root_cause": None,
+            "affected_entities": [],
+            "risk_level": "UNKNOWN",
+            "recommended_actions": ["Check API key and network connectivity."],
+            "confidence_score": 0.0,
+        }
 
     # ── logging ───────────────────────────────────────
     def _ensure_log(self):
@@ -0,0 +1,31 @@
+"""
+gemini_client.py — process-wide google-genai clients
+
+API keys are read from the GEMINI_API_KEY environment variable unless a
+caller passes one explicitly; none live in source. One client is kept per
+key, so every agent and request reuses the same HTTP connection pool
+instead of opening new TLS sessions to Gemini.
+"""
+import os
+import threading
+
+from google import genai
+
+_clients: dict[str, genai.Client] = {}
+_lock = threading.Lock()
+
+
+def api_key() -> str:
+    """GEMINI_API_KEY from the environment, or "" if unset."""
+    return os.environ.get("GEMINI_API_KEY", "").strip()
+
+
+def get_client(key: str = "") -> genai.Client:
+    """Shared client for key (default: GEMINI_API_KEY)."""
+    key = key or api_key()
+    with _lock:
+        client = _clients.get(key)
+        if client is None:
+            # None lets the SDK raise its own "missing API key" error
+            client = _clients[key] = genai.Client(api_key=key or None)
+    return client
@@ -17,7 +17,6 @@ logger = logging.getLogger(__name__)
 
 # ── API configuration ─────────────────────────────────────────────────────────
 _BASE_URL  = "http://api.weatherapi.com/v1"
-_HARD_KEY  = "6a207d99900c4ce2bc783139262102"   # WeatherAPI.com key
 _TIMEOUT_S = 6
 
 # ── Mock fallback ──────────────────────────────────────────────────────────────
@@ -31,7 +30,7 @@ _MOCK = [
 
 
 def _api_key() -> str:
-    return os.environ.get("WEATHER_API_KEY", _HARD_KEY).strip()
+    return os.environ.get("WEATHER_API_KEY", "").strip()
 
 
 def _assess_risk(condition: str, wind_kph: float, precip_mm: float) -> str:
@@ -65,6 +64,8 @@ def get_weather(lat: float, lng: float) -> dict:
         import requests  # lazy — keeps import from crashing blueprint on startup
 
         key  = _api_key()
+        if not key:
+            return _mock_weather(lat, lng)
         url  = f"{_BASE_URL}/current.json"
         resp = requests.get(url, params={"key": key, "q": f"{lat},{lng}", "aqi": "no"}, timeout=_TIMEOUT_S)
         resp.raise_for_status()
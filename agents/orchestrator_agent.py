@@ -1,11 +1,13 @@
 import json
 from typing import Dict, Any
-from google import genai
+from agents.gemini_client import get_client
 from execution.orchestration_logger import OrchestrationLogger
 
 class AutonomousOrchestratorAgent:
-    def __init__(self, api_key: str, model_name: str = "gemini-3-flash-preview"):
-        self.client = genai.Client(api_key=api_key)
+    def __init__(self, api_key: str = "", model_name: str = "gemini-3-flash-preview"):
+        # Client is created on first run(): ProductionService always builds
+        # this agent, and without a key that must not break /production
+        self.api_key = api_key
         self.model_name = model_name
         self.logger = OrchestrationLogger("data_base/orchestration_log.csv")
 
@@ -40,6 +42,10 @@ Return ONLY valid JSON in this format:
 }
 """
 
+    @property
+    def client(self):
+        return get_client(self.api_key)
+
     def run(self, structured_input: Dict[str, Any]) -> Dict[str, Any]:
       prompt = f"""
   SYSTEM:
@@ -1,6 +1,8 @@
 # agents/supplier_agent.py
 
+import hashlib
 import logging
+from collections import OrderedDict
 from dataclasses import dataclass
 from typing import List, Dict, Optional
 import pandas as pd
@@ -18,6 +20,20 @@ from sklearn.metrics import r2_score
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+FEATURE_COLUMNS = [
+    "normalized_cost",
+    "normalized_lead_time",
+    "reliability_score",
+    "rating",
+    "quality_score",
+    "on_time_delivery_rate",
+    "risk_level_encoded",
+    "defect_rate"
+]
+
+# Trained model pairs kept per (product_id, training-data fingerprint)
+MODEL_CACHE_SIZE = 32
+
 
 # --------------------------------------------------
 # Dataclass
@@ -52,15 +68,8 @@ class SupplierRankingAgent:
         self.product_path = supplier_product_path
         self.performance_path = supplier_performance_path
 
-        self.performance_model = RandomForestRegressor(
-            n_estimators=120,
-            random_state=42
-        )
-
-        self.risk_model = RandomForestRegressor(
-            n_estimators=120,
-            random_state=42
-        )
+        self.performance_model = self._new_model()
+        self.risk_model = self._new_model()
 
         self.scaler = MinMaxScaler()
         self.risk_encoder = LabelEncoder()
@@ -79,6 +88,18 @@ class SupplierRankingAgent:
 
         self.data = None
 
+        # Preprocessed frames per product_id and trained models per
+        # (product_id, data fingerprint); both reset on load_data()
+        self._preprocessed: Dict[str, pd.DataFrame] = {}
+        self._models: "OrderedDict[tuple, tuple]" = OrderedDict()
+
+    @staticmethod
+    def _new_model() -> RandomForestRegressor:
+        return RandomForestRegressor(
+            n_estimators=120,
+            random_state=42
+        )
+
     # --------------------------------------------------
     # 1. Load Data
     # --------------------------------------------------
@@ -97,6 +118,8 @@ class SupplierRankingAgent:
         )
 
         self.data = df
+        self._preprocessed.clear()
+        self._models.clear()
         logger.info("Data loaded successfully.")
 
     # --------------------------------------------------
@@ -105,6 +128,10 @@ class SupplierRankingAgent:
 
     def preprocess_data(self, product_id: str) -> pd.DataFrame:
 
+        cached = self._preprocessed.get(product_id)
+        if cached is not None:
+            return cached.copy()
+
         df = self.data[self.data["product_id"] == product_id].copy()
 
         if df.empty:
@@ -123,7 +150,8 @@ class SupplierRankingAgent:
         )
         df["defect_rate"] = df["defect_rate"].fillna(0.1)
 
-        return df
+        self._preprocessed[product_id] = df
+        return df.copy()
 
     # --------------------------------------------------
     # 3. Feature Engineering
@@ -178,18 +206,27 @@ class SupplierRankingAgent:
     # 4. Train ML Models
     # --------------------------------------------------
 
-    def train_model(self, df: pd.DataFrame) -> None:
+    def train_model(self, df: pd.DataFrame, product_id: Optional[str] = None) -> None:
+
+        features = df[FEATURE_COLUMNS]
+
+        # Identical training data yields identical models: reuse them
+        fingerprint = hashlib.blake2b(
+            pd.util.hash_pandas_object(
+                df[FEATURE_COLUMNS + ["average_delay_days"]], index=False
+            ).to_numpy().tobytes(),
+            digest_size=16
+        ).hexdigest()
+        cache_key = (product_id, fingerprint)
 
-        features = df[[
-            "normalized_cost",
-            "normalized_lead_time",
-            "reliability_score",
-            "rating",
-            "quality_score",
-            "on_time_delivery_rate",
-            "risk_level_encoded",
-            "defect_rate"
-        ]]
+        if cache_key in self._models:
+            self._models.move_to_end(cache_key)
+            (
+                self.performance_model, self.risk_model,
+                self.performance_r2, self.risk_r2
+            ) = self._models[cache_key]
+            logger.info(f"Reusing trained models for {product_id}")
+            return
 
         performance_target = (
             df["on_time_delivery_rate"] * 0.6
@@ -209,8 +246,8 @@ class SupplierRankingAgent:
             features, risk_target, test_size=0.2, random_state=42
         )
 
-        self.performance_model.fit(X_train, y_train_perf)
-        self.risk_model.fit(X_train, y_train_risk)
+        self.performance_model = self._new_model().fit(X_train, y_train_perf)
+        self.risk_model = self._new_model().fit(X_train, y_train_risk)
 
         # Store R2 scores
         self.performance_r2 = r2_score(
@@ -226,22 +263,20 @@ class SupplierRankingAgent:
         logger.info(f"Performance Model R2: {self.performance_r2:.4f}")
         logger.info(f"Risk Model R2: {self.risk_r2:.4f}")
 
+        self._models[cache_key] = (
+            self.performance_model, self.risk_model,
+            self.performance_r2, self.risk_r2
+        )
+        if len(self._models) > MODEL_CACHE_SIZE:
+            self._models.popitem(last=False)
+
     # --------------------------------------------------
     # 5. Predict Scores
     # --------------------------------------------------
 
     def predict_scores(self, df: pd.DataFrame):
 
-        features = df[[
-            "normalized_cost",
-            "normalized_lead_time",
-            "reliability_score",
-            "rating",
-            "quality_score",
-            "on_time_delivery_rate",
-            "risk_level_encoded",
-            "defect_rate"
-        ]]
+        features = df[FEATURE_COLUMNS]
 
         df["predicted_performance_score"] = \
             self.performance_model.predict(features)
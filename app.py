@@ -1,7 +1,9 @@
 from flask import Flask
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
 
 import logging
+import orjson
 
 logging.basicConfig(
     level=logging.INFO,
@@ -9,6 +11,40 @@ logging.basicConfig(
 )
 
 
+class OrjsonProvider(DefaultJSONProvider):
+    """
+    JSON provider backed by orjson.
+
+    Keeps Flask's defaults (sorted keys, debug indentation, fallback
+    `default` hook) while serializing in C, including numpy scalars and
+    arrays coming out of pandas records. Dates and datetimes (pd.Timestamp
+    included) go through `default`, so they stay HTTP dates as with the
+    stock provider. One difference: NaN and inf become null, not the bare
+    NaN token Flask's json module writes.
+    """
+
+    def _option(self, sort_keys=None, indent=None) -> int:
+        option = (orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+                  | orjson.OPT_PASSTHROUGH_DATETIME)
+        if self.sort_keys if sort_keys is None else sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return option
+
+    def dumps(self, obj, **kwargs) -> str:
+        option = self._option(kwargs.get("sort_keys"), kwargs.get("indent"))
+        return orjson.dumps(obj, default=self.default, option=option).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        body = orjson.dumps(obj, default=self.default, option=self._option(indent=indent))
+        return self._app.response_class(body, mimetype=self.mimetype)
+
 
 def create_app(config_object: str | None = None) -> Flask:
     """
@@ -24,6 +60,7 @@ def create_app(config_object: str | None = None) -> Flask:
     """
 
     app = Flask(__name__)
+    app.json = OrjsonProvider(app)
 
     # ------------------------------------------------------------------
     # CORS – allow all origins so Expo Go / mobile devices can connect
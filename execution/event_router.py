@@ -8,6 +8,12 @@ from datetime import datetime
 import pandas as pd
 
 
+_RESPONSE_TEMPLATE = {
+    "event_type": "INVENTORY_EVALUATION_COMPLETED",
+    "source": "EventRouter"
+}
+
+
 class EventRouterException(Exception):
     """Base exception for EventRouter errors."""
     pass
@@ -42,21 +48,6 @@ class ERPEventRouter:
         demand_config: Dict[str, Dict[str, Any]],
         policy_config: Dict[str, Dict[str, Any]]
     ) -> Dict[str, Any]:
-        inventory_analysis_list = []
-        supplier_ranking_results = []
-
-        logger.info("Inventory event received by EventRouter")
-
-        self._validate_event_structure(inventory_event)
-
-        production_id = inventory_event["production_id"]
-        print(production_id)
-        affected_materials = inventory_event["affected_materials"]
-        print(affected_materials)
-
-        logger.info(
-            f"Processing INVENTORY_UPDATED for Production {production_id}"
-        )
         """
         React to INVENTORY_UPDATED event.
 
@@ -66,23 +57,27 @@ class ERPEventRouter:
         :param policy_config: Per-material policy configuration
         :return: Structured ERP-level response
         """
+        now = datetime.now().isoformat()
+
+        logger.info("Inventory event received by EventRouter")
 
         self._validate_event_structure(inventory_event)
 
         production_id = inventory_event["production_id"]
         affected_materials = inventory_event["affected_materials"]
 
-        decisions: List[Dict[str, Any]] = []
+        logger.info(
+            f"Processing INVENTORY_UPDATED for Production {production_id}"
+        )
+
+        supplier_ranking_results: List[Dict[str, Any]] = []
 
         reorder_count = 0
         po_count = 0
 
-        for material in affected_materials:
+        material_ids = [material["material_id"] for material in affected_materials]
 
-            material_id = material["material_id"]
-            logger.info(
-                f"Evaluating reorder for material: {material_id}"
-            )
+        for material_id in material_ids:
             if material_id not in demand_config:
                 raise EventRouterException(
                     f"Demand configuration missing for material: {material_id}"
@@ -93,73 +88,76 @@ class ERPEventRouter:
                     f"Policy configuration missing for material: {material_id}"
                 )
 
-            decision = self.reorder_service.handle_inventory_update(
-                inventory_df=inventory_df,
-                product_id=material_id,
-                demand_params=demand_config[material_id],
-                policy_config=policy_config[material_id]
-            )
-            logger.info(f"[DEBUG] Reorder decision for {material_id}: {decision}")
-
+        logger.info(f"Evaluating reorder for materials: {material_ids}")
 
-            decisions.append(decision)
+        # One array pass over all affected materials
+        decisions = self.reorder_service.handle_inventory_update_batch(
+            inventory_df=inventory_df,
+            product_ids=material_ids,
+            demand_config=demand_config,
+            policy_config=policy_config
+        )
 
-            if decision.get("reorder_trigger"):
-                    logger.info(f"[DEBUG] Reorder triggered for {material_id}")
-                    logger.info(f"[DEBUG] Recommended quantity: {decision.get('recommended_order_quantity')}")
+        for decision in decisions:
+            material_id = decision.material_id
+            logger.debug(f"Reorder decision for {material_id}: {decision}")
 
-                    reorder_count += 1
+            if decision.reorder_trigger:
+                logger.debug(f"Reorder triggered for {material_id}")
+                logger.debug(f"Recommended quantity: {decision.recommended_order_quantity}")
 
-                    material_id = decision["material_id"]
-                    qty = decision["recommended_order_quantity"]
+                reorder_count += 1
 
-                    inventory_analysis_list.append({
-                        "material_id": material_id,
-                        "quantity_to_order": qty
-                    })
+                qty = decision.recommended_order_quantity
 
-                    # ---- Supplier Ranking Pipeline ----
-                    df = self.supplier_agent.preprocess_data(product_id=material_id)
+                # ---- Supplier Ranking Pipeline ----
+                df = self.supplier_agent.preprocess_data(product_id=material_id)
 
-                    df = self.supplier_agent.feature_engineering(df, required_quantity=qty)
-                    self.supplier_agent.train_model(df)
-                    df = self.supplier_agent.predict_scores(df)
-                    df = self.supplier_agent.compute_confidence_score(df)
+                df = self.supplier_agent.feature_engineering(df, required_quantity=qty)
+                self.supplier_agent.train_model(df, product_id=material_id)
+                df = self.supplier_agent.predict_scores(df)
+                df = self.supplier_agent.compute_confidence_score(df)
 
-                    ranked_df, warning = self.supplier_agent.rank_suppliers(df)
-                    supplier_output = self.supplier_agent.generate_output(ranked_df, warning)
+                ranked_df, warning = self.supplier_agent.rank_suppliers(df)
+                supplier_output = self.supplier_agent.generate_output(ranked_df, warning)
 
-                    suppliers = supplier_output.get("top_suppliers") \
-                        or supplier_output.get("suppliers") \
-                        or supplier_output.get("ranked_suppliers") \
-                        or []
+                suppliers = supplier_output.get("top_suppliers") \
+                    or supplier_output.get("suppliers") \
+                    or supplier_output.get("ranked_suppliers") \
+                    or []
 
-                    supplier_ranking_results.append({
-                        "material_id": material_id,
-                        "suppliers": suppliers
-                    })
+                supplier_ranking_results.append({
+                    "material_id": material_id,
+                    "suppliers": suppliers
+                })
 
             
-            logger.info(
-                f"Reorder Trigger: {decision.get('reorder_trigger')} "
-                f"| Purchase Order Created: {bool(decision.get('purchase_order'))}"
-            )
+            logger.info(f"Reorder Trigger: {decision.reorder_trigger}")
 
         logger.info(
             f"Inventory evaluation completed | "
             f"Reorders: {reorder_count} | POs: {po_count}"
         )
 
-        if inventory_analysis_list:
+        if reorder_count:
+            # inventory_analysis is a projection of the triggered decisions,
+            # built only at the orchestrator boundary
             structured_input = {
                 "production_request": {
                     "order_id": production_id
                 },
                 "bill_of_materials": affected_materials,
-                "inventory_analysis": inventory_analysis_list,
+                "inventory_analysis": [
+                    {
+                        "material_id": decision.material_id,
+                        "quantity_to_order": decision.recommended_order_quantity
+                    }
+                    for decision in decisions
+                    if decision.reorder_trigger
+                ],
                 "supplier_ranking_results": supplier_ranking_results
             }
-            logger.info(f"[DEBUG] Structured input to orchestrator: {structured_input}")
+            logger.debug(f"Structured input to orchestrator: {structured_input}")
             orchestration_result = self.orchestrator_agent.run(structured_input)
 
         else:
@@ -168,7 +166,8 @@ class ERPEventRouter:
 
         return self._generate_response(
             production_id=production_id,
-            materials_evaluated=decisions,
+            timestamp=now,
+            materials_evaluated=[decision.to_dict() for decision in decisions],
             total_checked=len(affected_materials),
             reorder_count=reorder_count,
             po_count=po_count,
@@ -221,6 +220,7 @@ class ERPEventRouter:
     def _generate_response(
         self,
         production_id: str,
+        timestamp: str,
         materials_evaluated: List[Dict[str, Any]],
         total_checked: int,
         reorder_count: int,
@@ -232,9 +232,8 @@ class ERPEventRouter:
         """
 
         return {
-            "event_type": "INVENTORY_EVALUATION_COMPLETED",
-            "source": "EventRouter",
-            "timestamp": datetime.now().isoformat(),
+            **_RESPONSE_TEMPLATE,
+            "timestamp": timestamp,
             "production_id": production_id,
             "materials_evaluated": materials_evaluated,
             "reorder_summary": {
@@ -5,11 +5,11 @@ Appends logistics orchestration decisions to logistics_log.csv.
 """
 
 import csv
-import json
 import os
 import uuid
 from datetime import datetime
 import logging
+import orjson
 
 logger = logging.getLogger(__name__)
 
@@ -53,8 +53,8 @@ class LogisticsLogger:
             total_qty,
             total_distance_km,
             delivery_mode,
-            json.dumps(order_ids),
-            json.dumps(reasoning),
+            orjson.dumps(order_ids).decode(),
+            orjson.dumps(reasoning).decode(),
         ]
         with open(self.log_path, "a", newline="", encoding="utf-8") as f:
             csv.writer(f).writerow(row)
@@ -1,36 +1,49 @@
 import csv
+import os
+import random
+import threading
+import time
 import uuid
 from datetime import datetime
-import os
 
 
+_FIELDNAMES = [
+    "request_id",
+    "product_id",
+    "decision_summary",
+    "overall_risk",
+    "timestamp"
+]
+
 
 class OrchestrationLogger:
-    def __init__(self, log_path: str):
+    def __init__(self, log_path: str, cryptographic_ids: bool = False):
         self.log_path = log_path
+        # uuid4 reads /dev/urandom per call; only pay for it when the
+        # deployment needs unguessable ids (e.g. audit trails)
+        self.cryptographic_ids = cryptographic_ids
+        self._rng = random.Random(os.urandom(16))
+        self._lock = threading.Lock()
 
         if not os.path.exists(log_path):
-            with open(log_path, "w", newline="") as f:
-                writer = csv.writer(f)
-                writer.writerow([
-                    "request_id",
-                    "product_id",
-                    "decision_summary",
-                    "overall_risk",
-                    "timestamp"
-                ])
+            with open(log_path, "w", newline="", encoding="utf-8") as f:
+                csv.DictWriter(f, fieldnames=_FIELDNAMES).writeheader()
+
+    def _gen_id(self) -> str:
+        if self.cryptographic_ids:
+            return str(uuid.uuid4())
+        return f"{time.time_ns():x}-{self._rng.getrandbits(64):016x}"
 
     def log(self, product_id, decision_summary, overall_risk):
-        request_id = str(uuid.uuid4())
-
-        with open(self.log_path, "a", newline="") as f:
-            writer = csv.writer(f)
-            writer.writerow([
-                request_id,
-                product_id,
-                decision_summary,
-                overall_risk,
-                datetime.now()
-            ])
+        request_id = self._gen_id()
+
+        with self._lock, open(self.log_path, "a", newline="", encoding="utf-8") as f:
+            csv.DictWriter(f, fieldnames=_FIELDNAMES).writerow({
+                "request_id": request_id,
+                "product_id": product_id,
+                "decision_summary": decision_summary,
+                "overall_risk": overall_risk,
+                "timestamp": datetime.now()
+            })
 
         return request_id
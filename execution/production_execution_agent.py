@@ -1,9 +1,10 @@
 import pandas as pd
 from datetime import datetime
 import os
+import csv
 import json
 import logging
-from google import genai
+from agents.gemini_client import get_client
 logger = logging.getLogger("ERP.Production")
 
 
@@ -16,6 +17,27 @@ STAGE_SEQUENCE = [
     "COMPLETED"
 ]
 
+# Key / label columns per table. These are read as plain strings so pandas
+# skips type inference on them and ids are never coerced to numbers.
+STRING_COLUMNS = {
+    "production_orders.csv": [
+        "production_id","order_id","product_id",
+        "current_stage","status","created_at","last_updated"
+    ],
+    "wip_tracking.csv": [
+        "production_id","stage_name","status","last_updated"
+    ],
+    "finished_goods_inventory.csv": [
+        "product_id","last_updated"
+    ],
+    "inventory.csv": [
+        "product_id","warehouse_location","last_updated","inventory_type"
+    ],
+    "bom.csv": [
+        "finished_product_id","component_product_id"
+    ]
+}
+
 
 class ProductionExecutionAgent:
 
@@ -35,7 +57,7 @@ class ProductionExecutionAgent:
 
         # Gemini model for QC failure suggestions
         if api_key:
-            self.qc_client = genai.Client(api_key=api_key)
+            self.qc_client = get_client(api_key)
             self.qc_model_name = "gemini-2.0-flash"
         else:
             self.qc_client = None
@@ -76,15 +98,20 @@ class ProductionExecutionAgent:
             if not os.path.exists(path):
                 pd.DataFrame(columns=columns).to_csv(path, index=False)
 
+    def _read_table(self, path, **kwargs):
+        columns = STRING_COLUMNS.get(os.path.basename(path), [])
+        return pd.read_csv(path, dtype=dict.fromkeys(columns, str), **kwargs)
+
     def run(self, input_data):
 
         action = input_data.get("action")
+        now = datetime.now().isoformat()
 
         if action == "CREATE_PRODUCTION":
-            return self._create_production(input_data["production_data"])
+            return self._create_production(input_data["production_data"], now)
 
         if action == "UPDATE_STAGE":
-            return self._update_stage(input_data["stage_update"])
+            return self._update_stage(input_data["stage_update"], now)
 
         return {
             "status": "ERROR",
@@ -93,22 +120,21 @@ class ProductionExecutionAgent:
 
     # ---------------- CREATE ---------------- #
 
-    def _create_production(self, data):
-        now = datetime.now().isoformat()
+    def _create_production(self, data, now):
 
-        prod_df = pd.read_csv(self.production_orders_path)
-        wip_df = pd.read_csv(self.wip_path)
+        prod_df = self._read_table(self.production_orders_path, index_col="production_id")
+        wip_df = self._read_table(self.wip_path)
 
         # -----------------------------
         # DUPLICATE CHECK (IMPORTANT)
         # -----------------------------
-        if data["production_id"] in prod_df["production_id"].values:
+        if data["production_id"] in prod_df.index:
             return {
                 "status": "ERROR",
                 "message": "Production ID already exists in production_orders"
             }
 
-        if data["production_id"] in wip_df["production_id"].values:
+        if data["production_id"] in wip_df["production_id"].to_numpy():
             return {
                 "status": "ERROR",
                 "message": "Production ID already exists in WIP"
@@ -128,8 +154,8 @@ class ProductionExecutionAgent:
             "last_updated": now
         }
 
-        prod_df = pd.concat([prod_df, pd.DataFrame([new_row])], ignore_index=True)
-        prod_df.to_csv(self.production_orders_path, index=False)
+        prod_df = pd.concat([prod_df, pd.DataFrame([new_row]).set_index("production_id")])
+        prod_df.to_csv(self.production_orders_path)
 
         # -----------------------------
         # CREATE WIP ENTRY
@@ -158,26 +184,24 @@ class ProductionExecutionAgent:
 
     # ---------------- UPDATE ---------------- #
 
-    def _update_stage(self, data):
+    def _update_stage(self, data, now):
 
-        now = datetime.now().isoformat()
         logger.info(f"Event Router attached? {self.event_router is not None}")
 
-        prod_df = pd.read_csv(self.production_orders_path)
-        wip_df = pd.read_csv(self.wip_path)
-        fg_df = pd.read_csv(self.fg_inventory_path)
+        prod_df = self._read_table(self.production_orders_path, index_col="production_id")
+        wip_df = self._read_table(self.wip_path)
+        fg_df = self._read_table(self.fg_inventory_path, index_col="product_id")
 
         production_id = data["production_id"]
         completed_stage = data["completed_stage"]
         quantity_completed = data["quantity_completed"]
         qc_passed = data.get("qc_passed", True)
 
-        prod_row = prod_df[prod_df["production_id"] == production_id]
-
-        if prod_row.empty:
+        if production_id not in prod_df.index:
             return {"status": "ERROR", "message": "Production not found"}
 
-        current_stage = prod_row.iloc[0]["current_stage"]
+        current_stage = prod_df.at[production_id, "current_stage"]
+        product_id = prod_df.at[production_id, "product_id"]
 
         if completed_stage != current_stage:
             return {"status": "ERROR", "message": "Invalid stage transition"}
@@ -187,10 +211,8 @@ class ProductionExecutionAgent:
         # ============================================================
         if completed_stage == "MATERIAL_ISSUED":
                         
-            inventory_df = pd.read_csv(self.inventory_path)
-            bom_df = pd.read_csv(self.bom_path)
-
-            product_id = prod_row.iloc[0]["product_id"]
+            inventory_df = self._read_table(self.inventory_path)
+            bom_df = self._read_table(self.bom_path)
 
             product_bom = bom_df[
                 bom_df["finished_product_id"] == product_id
@@ -202,64 +224,54 @@ class ProductionExecutionAgent:
                     "message": "No BOM defined for this product"
                 }
 
-            # VALIDATION FIRST
-            for _, bom_row in product_bom.iterrows():
-
-                component_id = bom_row["component_product_id"]
-                per_unit_required = bom_row["quantity_required"]
+            component_ids = product_bom["component_product_id"].to_numpy()
+            total_required = (
+                product_bom["quantity_required"].to_numpy() * quantity_completed
+            )
 
-                total_required = per_unit_required * quantity_completed
+            # first inventory row per component, aligned to BOM order
+            component_inv = inventory_df.drop_duplicates("product_id") \
+                .set_index("product_id") \
+                .reindex(component_ids)
 
-                inv_row = inventory_df[
-                    inventory_df["product_id"] == component_id
-                ]
-
-                if inv_row.empty or \
-                inv_row.iloc[0]["current_stock"] < total_required:
+            # VALIDATION FIRST
+            stock = component_inv["current_stock"].to_numpy()
+            shortage = pd.isna(stock) | (stock < total_required)
 
-                    return {
-                        "status": "ERROR",
-                        "message": "Insufficient raw material",
-                        "product_id": component_id
-                    }
+            if shortage.any():
+                return {
+                    "status": "ERROR",
+                    "message": "Insufficient raw material",
+                    "product_id": component_ids[shortage.argmax()]
+                }
 
             # REDUCTION (after validation)
-            affected_materials = []
+            consumed = pd.Series(total_required, index=component_ids) \
+                .groupby(level=0).sum()
+            reduced = inventory_df["product_id"].isin(consumed.index)
 
-            for _, bom_row in product_bom.iterrows():
+            inventory_df.loc[reduced, "current_stock"] -= \
+                inventory_df.loc[reduced, "product_id"].map(consumed)
+            inventory_df.loc[reduced, "last_updated"] = now
 
-                component_id = bom_row["component_product_id"]
-                per_unit_required = bom_row["quantity_required"]
-
-                total_required = per_unit_required * quantity_completed
-
-                # get correct inventory row
-                inv_row = inventory_df[
-                    inventory_df["product_id"] == component_id
-                ]
-
-                # optional warehouse column support
-                if "warehouse_location" in inventory_df.columns:
-                    warehouse_location = inv_row.iloc[0]["warehouse_location"]
-                else:
-                    warehouse_location = "WH1"
-
-                # reduce stock
-                inventory_df.loc[
-                    inventory_df["product_id"] == component_id,
-                    "current_stock"
-                ] -= total_required
-
-                inventory_df.loc[
-                    inventory_df["product_id"] == component_id,
-                    "last_updated"
-                ] = now
+            # optional warehouse column support
+            if "warehouse_location" in component_inv.columns:
+                warehouse_locations = component_inv["warehouse_location"].tolist()
+            else:
+                warehouse_locations = ["WH1"] * len(component_ids)
 
-                affected_materials.append({
+            affected_materials = [
+                {
                     "material_id": component_id,
-                    "quantity_consumed": total_required,
+                    "quantity_consumed": quantity,
                     "warehouse_location": warehouse_location
-                })
+                }
+                for component_id, quantity, warehouse_location in zip(
+                    component_ids.tolist(),
+                    total_required.tolist(),
+                    warehouse_locations
+                )
+            ]
             inventory_df.to_csv(self.inventory_path, index=False)
 
             # Emit event only if router exists
@@ -295,24 +307,20 @@ class ProductionExecutionAgent:
 
             if qc_passed:
 
-                prod_df.loc[prod_df["production_id"] == production_id,
+                prod_df.loc[production_id,
                             ["current_stage","status","last_updated"]] = [
                                 "COMPLETED","COMPLETED",now
                             ]
 
-                product_id = prod_row.iloc[0]["product_id"]
-
-                if product_id in fg_df["product_id"].values:
-                    fg_df.loc[fg_df["product_id"] == product_id,
-                              "current_stock"] += quantity_completed
-                    fg_df.loc[fg_df["product_id"] == product_id,
-                              "last_updated"] = now
+                if product_id in fg_df.index:
+                    fg_df.at[product_id, "current_stock"] += quantity_completed
+                    fg_df.at[product_id, "last_updated"] = now
                 else:
                     fg_df = pd.concat([fg_df, pd.DataFrame([{
                         "product_id": product_id,
                         "current_stock": quantity_completed,
                         "last_updated": now
-                    }])])
+                    }]).set_index("product_id")])
 
                 wip_df.loc[
                     (wip_df["production_id"] == production_id) &
@@ -320,9 +328,9 @@ class ProductionExecutionAgent:
                     ["status","last_updated"]
                 ] = ["COMPLETED", now]
 
-                prod_df.to_csv(self.production_orders_path, index=False)
+                prod_df.to_csv(self.production_orders_path)
                 wip_df.to_csv(self.wip_path, index=False)
-                fg_df.to_csv(self.fg_inventory_path, index=False)
+                fg_df.to_csv(self.fg_inventory_path)
 
                 return {
                     "status": "SUCCESS",
@@ -336,7 +344,7 @@ class ProductionExecutionAgent:
 
             else:
 
-                prod_df.loc[prod_df["production_id"] == production_id,
+                prod_df.loc[production_id,
                             ["current_stage","status","last_updated"]] = [
                                 "ASSEMBLY","REWORK",now
                             ]
@@ -349,7 +357,7 @@ class ProductionExecutionAgent:
                     "last_updated": now
                 }])])
 
-                prod_df.to_csv(self.production_orders_path, index=False)
+                prod_df.to_csv(self.production_orders_path)
                 wip_df.to_csv(self.wip_path, index=False)
 
                 # -----------------------------------------
@@ -358,7 +366,6 @@ class ProductionExecutionAgent:
                 llm_suggestions = ""
                 if self.qc_client and self.qc_model_name:
                     try:
-                        product_id = prod_row.iloc[0]["product_id"]
                         prompt = f"""You are a manufacturing quality control expert.
 
 A product has FAILED quality check in our production line. Provide recovery suggestions.
@@ -399,16 +406,16 @@ Return ONLY valid JSON."""
                 # -----------------------------------------
                 # Log QC Failure to CSV
                 # -----------------------------------------
-                qc_log_df = pd.read_csv(self.qc_log_path)
-                qc_log_df = pd.concat([qc_log_df, pd.DataFrame([{
-                    "production_id": production_id,
-                    "product_id": prod_row.iloc[0]["product_id"],
-                    "quantity_failed": quantity_completed,
-                    "stage_returned_to": "ASSEMBLY",
-                    "timestamp": now,
-                    "llm_suggestions": llm_suggestions
-                }])], ignore_index=True)
-                qc_log_df.to_csv(self.qc_log_path, index=False)
+                # Append-only: add one row instead of rewriting the log
+                with open(self.qc_log_path, "a", newline="", encoding="utf-8") as f:
+                    csv.writer(f).writerow([
+                        production_id,
+                        product_id,
+                        quantity_completed,
+                        "ASSEMBLY",
+                        now,
+                        llm_suggestions
+                    ])
 
                 return {
                     "status": "SUCCESS",
@@ -444,12 +451,12 @@ Return ONLY valid JSON."""
             "last_updated": now
         }])])
 
-        prod_df.loc[prod_df["production_id"] == production_id,
+        prod_df.loc[production_id,
                     ["current_stage","status","last_updated"]] = [
                         next_stage,"IN_PROGRESS",now
                     ]
 
-        prod_df.to_csv(self.production_orders_path, index=False)
+        prod_df.to_csv(self.production_orders_path)
         wip_df.to_csv(self.wip_path, index=False)
 
         result = {
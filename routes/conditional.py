@@ -0,0 +1,30 @@
+"""
+conditional.py — ETag / 304 support for GET endpoints backed by CSV files
+
+Dashboards poll the list endpoints; when none of the source files changed
+since the client's last response, answer 304 without running the view.
+"""
+import functools
+
+from flask import Response, make_response, request
+
+from services import csv_cache
+
+
+def etag_from(*paths: str):
+    """Tag responses of the decorated view with an ETag over paths."""
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            tag = csv_cache.etag(*paths)
+            if request.if_none_match.contains(tag):
+                response = Response(status=304)
+                response.set_etag(tag)
+                return response
+
+            response = make_response(view(*args, **kwargs))
+            if response.status_code == 200:
+                response.set_etag(tag)
+            return response
+        return wrapper
+    return decorator
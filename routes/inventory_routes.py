@@ -1,6 +1,8 @@
-from flask import Blueprint, request, jsonify, render_template
+from flask import Blueprint, Response, request, jsonify, render_template
 from services.inventory_service import InventoryService
-import pandas as pd
+from services import csv_cache
+from routes.conditional import etag_from
+import orjson
 import os
 
 inventory_bp = Blueprint("inventory", __name__)
@@ -13,18 +15,23 @@ def inventory_page():
 
 
 @inventory_bp.route("/items", methods=["GET"])
+@etag_from("data_base/inventory.csv")
 def list_inventory():
     """Return all inventory rows as JSON."""
     path = "data_base/inventory.csv"
     if not os.path.exists(path):
         return jsonify([])
     try:
-        df = pd.read_csv(path)
-        df = df.where(pd.notnull(df), None)
-        inv_type = request.args.get("type")
-        if inv_type:
-            df = df[df["inventory_type"] == inv_type.upper()]
-        return jsonify(df.to_dict(orient="records"))
+        inv_type = (request.args.get("type") or "").upper()
+
+        def build():
+            rows = csv_cache.rows(path, numeric=("current_stock", "reserved_stock"))
+            if inv_type:
+                rows = [r for r in rows if r["inventory_type"] == inv_type]
+            return rows
+
+        rows = csv_cache.filtered((path,), ("inventory_type", inv_type), build)
+        return Response(orjson.dumps(rows), mimetype="application/json")
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
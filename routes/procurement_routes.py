@@ -1,8 +1,18 @@
-from flask import Blueprint, request, jsonify, render_template
-from services.procurement_service import ProcurementService
+from flask import Blueprint, Response, request, jsonify, render_template
+import orjson
+from services.procurement_service import ProcurementService, PO_CSV_PATH, PO_EVENTS_PATH
+from routes.conditional import etag_from
 
 procurement_bp = Blueprint("procurement", __name__, url_prefix="/procurement")
-service = ProcurementService()
+
+# ── lazy singleton ────────────────────────────────────
+_service = None
+
+def _get_service():
+    global _service
+    if _service is None:
+        _service = ProcurementService()
+    return _service
 
 
 @procurement_bp.route("/", methods=["GET"])
@@ -11,10 +21,14 @@ def procurement_page():
 
 
 @procurement_bp.route("/orders", methods=["GET"])
+@etag_from(PO_CSV_PATH, PO_EVENTS_PATH)
 def list_orders():
     status_filter = request.args.get("status")
-    orders = service.list_purchase_orders(status_filter=status_filter)
-    return jsonify(orders)
+    orders = _get_service().list_purchase_orders(status_filter=status_filter)
+    return Response(
+        orjson.dumps(orders, option=orjson.OPT_SERIALIZE_NUMPY),
+        mimetype="application/json"
+    )
 
 
 @procurement_bp.route("/approve", methods=["POST"])
@@ -22,7 +36,7 @@ def approve_order():
     po_id = request.json.get("po_id")
     if not po_id:
         return jsonify({"status": "ERROR", "message": "po_id is required"}), 400
-    return jsonify(service.approve_po(po_id))
+    return jsonify(_get_service().approve_po(po_id))
 
 
 @procurement_bp.route("/reject", methods=["POST"])
@@ -30,7 +44,7 @@ def reject_order():
     po_id = request.json.get("po_id")
     if not po_id:
         return jsonify({"status": "ERROR", "message": "po_id is required"}), 400
-    return jsonify(service.reject_po(po_id))
+    return jsonify(_get_service().reject_po(po_id))
 
 @procurement_bp.route("/receive", methods=["POST"])
 def receive_order():
@@ -38,4 +52,4 @@ def receive_order():
     if not payload or not payload.get("po_id"):
         return jsonify({"status": "ERROR", "message": "po_id is required"}), 400
     
-    return jsonify(service.receive_po(payload))
+    return jsonify(_get_service().receive_po(payload))
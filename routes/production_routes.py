@@ -1,11 +1,25 @@
-from flask import Blueprint, request, jsonify, render_template
+from flask import Blueprint, Response, request, jsonify, render_template
 from services.production_service import ProductionService
+from services import csv_cache
+from routes.conditional import etag_from
 import pandas as pd
 import os
-import json
+import re
+import orjson
 
 production_bp = Blueprint("production", __name__, url_prefix="/production")
-service = ProductionService()
+
+# Markdown code fence (``` or ```json) around LLM JSON output
+FENCE_RE = re.compile(r"^```(?:json)?\s*|\s*```$")
+
+# ── lazy singleton ────────────────────────────────────
+_service = None
+
+def _get_service():
+    global _service
+    if _service is None:
+        _service = ProductionService()
+    return _service
 
 
 @production_bp.route("/", methods=["GET"])
@@ -14,88 +28,86 @@ def production_ui():
 
 
 @production_bp.route("/orders", methods=["GET"])
+@etag_from("data_base/production_orders.csv")
 def list_production_orders():
     """List all production orders from CSV."""
     path = "data_base/production_orders.csv"
     if not os.path.exists(path):
         return jsonify([])
     try:
-        df = pd.read_csv(path)
-        df = df.where(pd.notnull(df), None)
-        return jsonify(df.to_dict(orient="records"))
+        rows = csv_cache.rows(path, numeric=("target_quantity",))
+        return Response(orjson.dumps(rows), mimetype="application/json")
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 @production_bp.route("/create", methods=["POST"])
 def create_production():
-    return jsonify(service.create_production(request.json))
+    return jsonify(_get_service().create_production(request.json))
 
 
 @production_bp.route("/material-issued", methods=["POST"])
 def material_issued():
-    return jsonify(service.update_stage(
+    return jsonify(_get_service().update_stage(
         request.json, completed_stage="MATERIAL_ISSUED"
     ))
 
 
 @production_bp.route("/fabrication", methods=["POST"])
 def fabrication():
-    return jsonify(service.update_stage(
+    return jsonify(_get_service().update_stage(
         request.json, completed_stage="FABRICATION"
     ))
 
 
 @production_bp.route("/assembly", methods=["POST"])
 def assembly():
-    return jsonify(service.update_stage(
+    return jsonify(_get_service().update_stage(
         request.json, completed_stage="ASSEMBLY"
     ))
 
 
 @production_bp.route("/painting", methods=["POST"])
 def painting():
-    return jsonify(service.update_stage(
+    return jsonify(_get_service().update_stage(
         request.json, completed_stage="PAINTING"
     ))
 
 
 @production_bp.route("/quality-check", methods=["POST"])
 def quality_check():
-    return jsonify(service.quality_check(request.json))
+    return jsonify(_get_service().quality_check(request.json))
 
 
 @production_bp.route("/rejected", methods=["GET"])
+@etag_from("data_base/quality_check_log.csv")
 def get_rejected_items():
     qc_log_path = "data_base/quality_check_log.csv"
     if not os.path.exists(qc_log_path):
         return jsonify([])
     
     try:
-        df = pd.read_csv(qc_log_path)
+        df = csv_cache.load(qc_log_path)
         # Convert NaN values to None for clean JSON serialization
         df = df.where(pd.notnull(df), None)
         
         items = []
-        for _, row in df.iterrows():
-            item = row.to_dict()
+        for row in df.itertuples(index=False):
+            item = row._asdict()
             # Try to parse the LLM suggestions if it's a JSON string
-            if isinstance(item.get("llm_suggestions"), str):
+            suggestions = item.get("llm_suggestions")
+            if isinstance(suggestions, str):
                 # Clean up markdown code block formatting if present
-                clean_json = item["llm_suggestions"].strip()
-                if clean_json.startswith("```json"):
-                    clean_json = clean_json[7:]
-                if clean_json.startswith("```"):
-                    clean_json = clean_json[3:]
-                if clean_json.endswith("```"):
-                    clean_json = clean_json[:-3]
-                clean_json = clean_json.strip()
+                clean_json = FENCE_RE.sub("", suggestions.strip())
                 
                 try:
-                    item["llm_suggestions"] = json.loads(clean_json)
+                    item["llm_suggestions"] = orjson.loads(clean_json)
                 except Exception:
                     pass # Keep as string if parsing fails
             items.append(item)
             
-        return jsonify(items)
+        return Response(
+            orjson.dumps(items, option=orjson.OPT_SERIALIZE_NUMPY),
+            mimetype="application/json"
+        )
     except Exception as e:
         return jsonify({"error": str(e)}), 500
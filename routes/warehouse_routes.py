@@ -5,32 +5,47 @@ from flask import Blueprint, jsonify, render_template, request
 from services.warehouse_service import (
     get_capacity_overview, get_inventory_breakdown,
     get_finished_goods, get_wip_summary, get_ai_insights,
-    run_warehouse_agent, run_order_allocation, run_reorder_check,
+    run_warehouse_agent_async, run_order_allocation_async, run_reorder_check_async,
+    BASE,
 )
+from services import response_cache
+from routes.conditional import etag_from
+import os
 
 warehouse_bp = Blueprint("warehouse", __name__, url_prefix="/warehouse")
 
+# Source CSVs per endpoint, for ETag / 304 on dashboard polling
+def _files(*names):
+    return [os.path.join(BASE, n) for n in names]
+
+_CAPACITY_FILES = _files("warehouse.csv", "inventory.csv", "finished_goods_inventory.csv")
+
 @warehouse_bp.route("/", methods=["GET"])
 def warehouse_page():
     return render_template("warehouse.html")
 
 @warehouse_bp.route("/capacity", methods=["GET"])
+@etag_from(*_CAPACITY_FILES)
 def capacity():
     return jsonify(get_capacity_overview())
 
 @warehouse_bp.route("/inventory", methods=["GET"])
+@etag_from(*_files("inventory.csv"))
 def inventory():
     return jsonify(get_inventory_breakdown())
 
 @warehouse_bp.route("/finished-goods", methods=["GET"])
+@etag_from(*_files("finished_goods_inventory.csv"))
 def finished_goods():
     return jsonify(get_finished_goods())
 
 @warehouse_bp.route("/wip", methods=["GET"])
+@etag_from(*_files("wip_tracking.csv"))
 def wip():
     return jsonify(get_wip_summary())
 
 @warehouse_bp.route("/insights", methods=["GET"])
+@etag_from(*_CAPACITY_FILES, *_files("wip_tracking.csv"))
 def insights():
     return jsonify(get_ai_insights())
 
@@ -39,31 +54,50 @@ def insights():
 # AI WAREHOUSE AGENT ENDPOINTS
 # ──────────────────────────────────────────────────────
 
+# Decisions keyed by action (+ order ids) and mtimes of the agent's input CSVs
+_agent_cache = response_cache.TTLCache(maxsize=512, ttl=300)
+
+def _agent_key(*parts):
+    from agents.warehouse_agent import BASE, STATE_FILES
+    return response_cache.make_key(*parts, response_cache.files_stamp(BASE, STATE_FILES))
+
 @warehouse_bp.route("/agent/analyze", methods=["POST"])
-def agent_analyze():
+async def agent_analyze():
     """Full warehouse agent analysis — state → rules → Gemini → decision."""
     try:
-        result = run_warehouse_agent()
+        key = _agent_key("full_analysis")
+        result = _agent_cache.get(key)
+        if result is None:
+            result = await run_warehouse_agent_async()
+            _agent_cache.set(key, result)
         return jsonify(result)
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 @warehouse_bp.route("/agent/allocate", methods=["POST"])
-def agent_allocate():
+async def agent_allocate():
     """Allocate specific orders to warehouses via Gemini reasoning."""
     try:
         body = request.get_json(silent=True) or {}
         order_ids = body.get("order_ids")
-        result = run_order_allocation(order_ids=order_ids)
+        key = _agent_key("allocate", order_ids)
+        result = _agent_cache.get(key)
+        if result is None:
+            result = await run_order_allocation_async(order_ids=order_ids)
+            _agent_cache.set(key, result)
         return jsonify(result)
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 @warehouse_bp.route("/agent/reorder-check", methods=["GET"])
-def agent_reorder_check():
+async def agent_reorder_check():
     """Check all materials for reorder needs via Gemini reasoning."""
     try:
-        result = run_reorder_check()
+        key = _agent_key("reorder_check")
+        result = _agent_cache.get(key)
+        if result is None:
+            result = await run_reorder_check_async()
+            _agent_cache.set(key, result)
         return jsonify(result)
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -0,0 +1,324 @@
+"""
+csv_cache.py — process-wide cache of parsed CSV tables
+
+A table is re-parsed only when its file's mtime/size changes, so repeated
+reads of an unchanged CSV are a dict lookup. Frames returned by load() and
+typed() are shared between callers: treat them as read-only and .copy()
+before mutating. index() maps key column values to row labels so point
+lookups skip the full-column equality scan. typed() casts columns once
+per file version, so callers don't re-run pd.to_numeric on every request.
+
+rows() is the pandas-free path for endpoints that only hand rows back as
+JSON: plain dicts from csv.DictReader, cached the same way. filtered()
+memoizes a filtered listing (e.g. ?status=) on the files' versions plus
+the filter, so repeat queries skip the scan.
+
+save() makes the new frame the cached version immediately and leaves the
+disk write to a background thread, which writes the latest frame per path
+every FLUSH_INTERVAL seconds. Reads through this module always see the
+saved frame; code reading the file directly sees it after the next flush.
+Files that are also written outside this module must be saved with
+sync=True, or a deferred flush can overwrite those writes.
+"""
+import atexit
+import csv
+import hashlib
+import logging
+import os
+import threading
+import time
+import pandas as pd
+
+# Seconds between background flushes of saved frames
+FLUSH_INTERVAL = 0.1
+
+# Filtered listings kept (bounded: user input picks the filter value)
+MAX_FILTERS = 32
+
+logger = logging.getLogger("ERP.CsvCache")
+
+_lock = threading.RLock()
+_flush_lock = threading.Lock()
+_wake = threading.Event()
+
+
+class _Entry:
+    __slots__ = ("stamp", "df", "typed", "indices")
+
+    def __init__(self, stamp, df):
+        self.stamp = stamp
+        self.df = df
+        self.typed = {}
+        self.indices = {}
+
+
+_cache: dict[str, _Entry] = {}
+_rows_cache: dict[str, tuple] = {}
+_filters: dict[tuple, tuple] = {}
+_pending: dict[str, pd.DataFrame] = {}
+_writer: threading.Thread | None = None
+
+
+def _stamp(path: str) -> tuple[int, int]:
+    st = os.stat(path)
+    return st.st_mtime_ns, st.st_size
+
+
+def _entry(path: str) -> _Entry:
+    key = os.path.abspath(path)
+
+    with _lock:
+        entry = _cache.get(key)
+        # stamp None: saved but not flushed yet, newer than the file
+        if entry is not None and entry.stamp is None:
+            return entry
+
+    stamp = _stamp(path)
+
+    with _lock:
+        entry = _cache.get(key)
+        if entry is not None and entry.stamp == stamp:
+            return entry
+
+    entry = _Entry(stamp, pd.read_csv(path))
+
+    with _lock:
+        _cache[key] = entry
+    return entry
+
+
+def load(path: str) -> pd.DataFrame:
+    """Return the parsed CSV at path, re-reading it only if it changed."""
+    return _entry(path).df
+
+
+def _cast(series: pd.Series, dtype: str) -> pd.Series:
+    if dtype.startswith("datetime"):
+        return pd.to_datetime(series, errors="coerce")
+    if dtype.startswith(("int", "float")):
+        return pd.to_numeric(series, errors="coerce").fillna(0).astype(dtype)
+    return series.astype(dtype)
+
+
+def typed(path: str, schema: dict) -> pd.DataFrame:
+    """
+    The CSV at path with schema's {column: dtype} applied, memoized per
+    file version. Unparseable numbers become 0 and unparseable dates NaT;
+    columns missing from the file are skipped.
+    """
+    if not schema:
+        return load(path)
+    entry = _entry(path)
+    # Schemas are fixed in code, so this stays small without eviction
+    key = tuple(sorted(schema.items()))
+
+    with _lock:
+        df = entry.typed.get(key)
+    if df is not None:
+        return df
+
+    df = entry.df.copy()
+    for column, dtype in schema.items():
+        if column in df.columns:
+            df[column] = _cast(df[column], dtype)
+
+    with _lock:
+        entry.typed[key] = df
+    return df
+
+
+def build_index(df: pd.DataFrame, *columns: str) -> dict:
+    """
+    {key: row label} for the first row holding each key. Keys are the
+    column value for one column, a tuple of values for several.
+    """
+    if len(columns) == 1:
+        keys = df[columns[0]]
+    else:
+        keys = zip(*(df[c] for c in columns))
+    index = {}
+    for key, label in zip(keys, df.index):
+        index.setdefault(key, label)
+    return index
+
+
+def index(path: str, *columns: str) -> dict:
+    """build_index() over the CSV at path, memoized per file version."""
+    entry = _entry(path)
+
+    with _lock:
+        idx = entry.indices.get(columns)
+    if idx is not None:
+        return idx
+
+    idx = build_index(entry.df, *columns)
+
+    with _lock:
+        entry.indices[columns] = idx
+    return idx
+
+
+def _number(value: str):
+    try:
+        return int(value)
+    except ValueError:
+        pass
+    try:
+        return float(value)
+    except ValueError:
+        # Bad cell in a numeric column: hand it back as-is, not a 500
+        return value
+
+
+def rows(path: str, numeric: tuple = ()) -> list[dict]:
+    """
+    Rows of the CSV at path as dicts, memoized per file version. Columns in
+    numeric are parsed as int/float (cells that aren't numbers stay
+    strings); empty cells become None, as NaN did on the pandas path.
+    """
+    key = os.path.abspath(path)
+    _settle(key)
+    stamp = _stamp(path)
+
+    with _lock:
+        cached = _rows_cache.get(key)
+        if cached is not None and cached[0] == stamp and cached[1] == numeric:
+            return cached[2]
+
+    with open(path, newline="", encoding="utf-8") as f:
+        records = list(csv.DictReader(f))
+    for record in records:
+        for column, value in record.items():
+            if value == "":
+                record[column] = None
+            elif column in numeric:
+                record[column] = _number(value)
+
+    with _lock:
+        _rows_cache[key] = (stamp, numeric, records)
+    return records
+
+
+def _stamps(paths) -> tuple:
+    # On-disk versions of paths, after flushing any pending saves to them
+    stamps = []
+    for path in paths:
+        _settle(os.path.abspath(path))
+        try:
+            stamps.append(_stamp(path))
+        except OSError:
+            stamps.append(None)
+    return tuple(stamps)
+
+
+def etag(*paths: str) -> str:
+    """Validator that changes whenever any of paths is written."""
+    return hashlib.blake2b(repr(_stamps(paths)).encode(), digest_size=16).hexdigest()
+
+
+def filtered(paths: tuple, predicate: tuple, build):
+    """
+    build() memoized on the versions of paths plus predicate, a hashable
+    description of the filter (e.g. ("status", "APPROVED")). The result is
+    shared between callers: do not mutate it.
+    """
+    key = (tuple(os.path.abspath(p) for p in paths), predicate)
+    stamps = _stamps(paths)
+
+    with _lock:
+        cached = _filters.get(key)
+        if cached is not None and cached[0] == stamps:
+            return cached[1]
+
+    result = build()
+
+    with _lock:
+        if len(_filters) >= MAX_FILTERS:
+            _filters.clear()
+        _filters[key] = (stamps, result)
+    return result
+
+
+def save(path: str, df: pd.DataFrame, sync: bool = False) -> None:
+    """
+    Make df the cached version of path and queue it to be written. With
+    sync=True the write happens before returning, for callers that also
+    touch the file directly (e.g. appends) and need the two ordered.
+    """
+    key = os.path.abspath(path)
+    with _lock:
+        _cache[key] = _Entry(None, df)
+        _pending[key] = df
+    if not sync:
+        _start_writer()
+        return
+    try:
+        flush()
+    except Exception:
+        # Still queued: let the background writer retry it
+        _start_writer()
+        raise
+
+
+def flush() -> None:
+    """
+    Write every saved-but-unwritten frame to disk now. Frames that fail to
+    write stay queued for the next flush; the first error is re-raised.
+    """
+    _flush(raise_errors=True)
+
+
+def _flush(raise_errors: bool) -> None:
+    errors = []
+    with _flush_lock:
+        with _lock:
+            batch = dict(_pending)
+
+        for key, df in batch.items():
+            try:
+                df.to_csv(key, index=False)
+                stamp = _stamp(key)
+            except Exception as e:
+                logger.error(f"Failed to write {key}, will retry: {e}")
+                errors.append(e)
+                continue
+            with _lock:
+                # A newer save() may have queued another frame meanwhile
+                if _pending.get(key) is df:
+                    del _pending[key]
+                entry = _cache.get(key)
+                if entry is not None and entry.df is df:
+                    entry.stamp = stamp
+
+    if errors and raise_errors:
+        raise errors[0]
+
+
+def _settle(key: str) -> None:
+    # Readers that go to the file itself need pending writes on disk first
+    if key in _pending:
+        flush()
+
+
+def _writer_loop() -> None:
+    while True:
+        # Idle until a deferred save arrives, then batch for FLUSH_INTERVAL
+        _wake.wait()
+        time.sleep(FLUSH_INTERVAL)
+        _wake.clear()
+        # Failures are logged and stay queued; keep the writer alive
+        _flush(raise_errors=False)
+        if _pending:
+            _wake.set()
+
+
+def _start_writer() -> None:
+    global _writer
+    with _lock:
+        if _writer is None:
+            _writer = threading.Thread(target=_writer_loop, name="csv-cache-writer", daemon=True)
+            _writer.start()
+    _wake.set()
+
+
+atexit.register(flush)
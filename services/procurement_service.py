@@ -1,10 +1,13 @@
 import csv
 import uuid
 import os
-from datetime import datetime
+import threading
+from datetime import datetime, timedelta
 import pandas as pd
 import logging
 
+from services import csv_cache
+
 logger = logging.getLogger("ERP.Procurement")
 
 PO_CSV_PATH = "data_base/purchase_orders.csv"
@@ -15,13 +18,89 @@ PO_COLUMNS = [
     "mitigation_strategy", "reasoning", "status", "created_at", "approved_at", "expected_delivery_date"
 ]
 
+# Status changes are appended to po_events.csv (next to purchase_orders.csv)
+# instead of rewriting the whole PO table; the base file is only rewritten
+# when the event log is compacted.
+PO_EVENT_COLUMNS = ["po_id", "timestamp", "status", "approved_at", "expected_delivery_date"]
+PO_STATE_FIELDS = ["status", "approved_at", "expected_delivery_date"]
+COMPACT_EVERY = 200
+
+_po_lock = threading.RLock()
+_po_views: dict = {}
+
+
+def _events_path(csv_path: str) -> str:
+    return os.path.join(os.path.dirname(csv_path), "po_events.csv")
+
+
+PO_EVENTS_PATH = _events_path(PO_CSV_PATH)
+
+SUPPLIER_PRODUCT_PATH = "data_base/supplier_product.csv"
+
+
+def load_purchase_orders(csv_path: str = PO_CSV_PATH) -> pd.DataFrame:
+    """
+    Current purchase orders: purchase_orders.csv with the latest event per
+    PO from po_events.csv applied. The frame is shared; do not mutate it.
+    """
+    base = csv_cache.load(csv_path)
+    events_path = _events_path(csv_path)
+    if not os.path.exists(events_path):
+        return base
+    events = csv_cache.load(events_path)
+    return _current_view(csv_path, base, events)[0]
+
+
+def find_purchase_order(po_id: str, csv_path: str = PO_CSV_PATH):
+    """Current row of po_id as a Series, or None if there is no such PO."""
+    base = csv_cache.load(csv_path)
+    events_path = _events_path(csv_path)
+    if os.path.exists(events_path):
+        current, index = _current_view(csv_path, base, csv_cache.load(events_path))
+    else:
+        current, index = base, csv_cache.index(csv_path, "po_id")
+
+    label = index.get(po_id)
+    if label is None:
+        return None
+    return current.loc[label]
+
+
+def _current_view(csv_path: str, base: pd.DataFrame, events: pd.DataFrame):
+    key = os.path.abspath(csv_path)
+    with _po_lock:
+        view = _po_views.get(key)
+        if view is not None and view[0] is base and view[1] is events:
+            return view[2], view[3]
+
+    if events.empty:
+        current = base
+    else:
+        latest = events.drop_duplicates("po_id", keep="last") \
+            .set_index("po_id")[PO_STATE_FIELDS]
+        current = base.copy()
+        current[PO_STATE_FIELDS] = current[PO_STATE_FIELDS].astype(object)
+        rows = current["po_id"].isin(latest.index)
+        current.loc[rows, PO_STATE_FIELDS] = \
+            latest.loc[current.loc[rows, "po_id"]].to_numpy()
+
+    index = csv_cache.build_index(current, "po_id")
+    with _po_lock:
+        _po_views[key] = (base, events, current, index)
+    return current, index
+
 
 class ProcurementService:
 
     def __init__(self, csv_path: str = PO_CSV_PATH):
         self.csv_path = csv_path
+        self.events_path = _events_path(csv_path)
         if not os.path.exists(csv_path):
             pd.DataFrame(columns=PO_COLUMNS).to_csv(csv_path, index=False)
+        if not os.path.exists(self.events_path):
+            pd.DataFrame(columns=PO_EVENT_COLUMNS).to_csv(self.events_path, index=False)
+        # (supplier_product frame, {(supplier_id, product_id): lead_time_days})
+        self._lead_times = None
 
     # --------------------------------------------------
     # Save procurement plan from orchestrator output
@@ -38,7 +117,7 @@ class ProcurementService:
             return []
 
         now = datetime.now().isoformat()
-        created_pos = []
+        rows = []
 
         for item in plan:
             po_id = f"PO-{uuid.uuid4().hex[:8].upper()}"
@@ -58,26 +137,30 @@ class ProcurementService:
                 "approved_at": "",
                 "expected_delivery_date": ""
             }
-
-            with open(self.csv_path, "a", newline="") as f:
-                writer = csv.DictWriter(f, fieldnames=PO_COLUMNS)
-                writer.writerow(row)
-
-            created_pos.append(po_id)
+            rows.append(row)
             logger.info(f"Purchase Order {po_id} created for {item.get('material_id')}")
 
-        return created_pos
+        with _po_lock, open(self.csv_path, "a", newline="") as f:
+            csv.DictWriter(f, fieldnames=PO_COLUMNS).writerows(rows)
+
+        return [row["po_id"] for row in rows]
 
     # --------------------------------------------------
     # List purchase orders
     # --------------------------------------------------
 
     def list_purchase_orders(self, status_filter: str = None) -> list:
-        df = pd.read_csv(self.csv_path)
-        df = df.fillna("")  # prevent NaN breaking JSON serialization
-        if status_filter:
-            df = df[df["status"] == status_filter]
-        return df.to_dict(orient="records")
+        """PO rows as dicts, memoized per PO/event file version and filter."""
+        def build():
+            df = load_purchase_orders(self.csv_path)
+            if status_filter:
+                df = df[df["status"] == status_filter]
+            df = df.fillna("")  # prevent NaN breaking JSON serialization
+            return df.to_dict(orient="records")
+
+        return csv_cache.filtered(
+            (self.csv_path, self.events_path), ("status", status_filter), build
+        )
 
     # --------------------------------------------------
     # Approve a purchase order
@@ -93,43 +176,64 @@ class ProcurementService:
     def reject_po(self, po_id: str) -> dict:
         return self._update_status(po_id, "REJECTED")
 
+    # --------------------------------------------------
+    # Internal: PO event log
+    # --------------------------------------------------
+
+    def _append_event(self, po_id: str, timestamp: str, status: str,
+                      approved_at="", expected_delivery_date="") -> None:
+        row = [po_id, timestamp, status, approved_at, expected_delivery_date]
+        row = ["" if pd.isna(value) else value for value in row]
+
+        with _po_lock:
+            with open(self.events_path, "a", newline="") as f:
+                csv.writer(f).writerow(row)
+            if len(csv_cache.load(self.events_path)) >= COMPACT_EVERY:
+                self.compact()
+
+    def compact(self) -> None:
+        """Fold po_events.csv into purchase_orders.csv and truncate the log."""
+        with _po_lock:
+            # sync: plan saves and events are appended to these files directly
+            csv_cache.save(self.csv_path, load_purchase_orders(self.csv_path), sync=True)
+            csv_cache.save(self.events_path, pd.DataFrame(columns=PO_EVENT_COLUMNS), sync=True)
+        logger.info("Compacted PO event log into purchase orders")
+
     # --------------------------------------------------
     # Internal: update PO status
     # --------------------------------------------------
 
     def _update_status(self, po_id: str, new_status: str) -> dict:
-        df = pd.read_csv(self.csv_path)
-        mask = df["po_id"] == po_id
+        po_row = find_purchase_order(po_id, self.csv_path)
 
-        if mask.sum() == 0:
+        if po_row is None:
             return {"status": "ERROR", "message": f"PO {po_id} not found"}
 
-        current = df.loc[mask, "status"].iloc[0]
+        current = po_row["status"]
         if current != "PENDING":
             return {"status": "ERROR", "message": f"PO {po_id} is already {current}"}
 
         now = datetime.now()
-        df.loc[mask, "status"] = new_status
+        now_iso = now.isoformat()
+        approved_at = ""
+        expected_delivery_date = ""
         if new_status == "APPROVED":
-            df.loc[mask, "approved_at"] = now.isoformat()
+            approved_at = now_iso
             
             # Calculate Expected Delivery Date
-            material_id = df.loc[mask, "material_id"].iloc[0]
-            supplier_id = df.loc[mask, "selected_supplier"].iloc[0]
+            material_id = po_row["material_id"]
+            supplier_id = po_row["selected_supplier"]
             
             try:
-                sup_prod_df = pd.read_csv("data_base/supplier_product.csv")
-                sp_row = sup_prod_df[(sup_prod_df["supplier_id"] == supplier_id) & (sup_prod_df["product_id"] == material_id)]
-                if not sp_row.empty:
-                    lead_time = int(sp_row.iloc[0]["lead_time_days"])
-                    from datetime import timedelta
+                lead_time = self._lead_time(supplier_id, material_id)
+                if lead_time is not None:
                     expected_date = now + timedelta(days=lead_time)
-                    df.loc[mask, "expected_delivery_date"] = expected_date.strftime("%Y-%m-%d")
-                    logger.info(f"Calculated expected delivery for {po_id}: {expected_date.strftime('%Y-%m-%d')} (Lead Time: {lead_time} days)")
+                    expected_delivery_date = expected_date.strftime("%Y-%m-%d")
+                    logger.info(f"Calculated expected delivery for {po_id}: {expected_delivery_date} (Lead Time: {lead_time} days)")
             except Exception as e:
                 logger.error(f"Failed to calculate expected delivery date for {po_id}: {e}")
 
-        df.to_csv(self.csv_path, index=False)
+        self._append_event(po_id, now_iso, new_status, approved_at, expected_delivery_date)
 
         logger.info(f"PO {po_id} status changed to {new_status}")
         return {
@@ -139,6 +243,17 @@ class ProcurementService:
             "message": f"Purchase order {new_status.lower()}"
         }
 
+    def _lead_time(self, supplier_id: str, material_id: str):
+        """Lead time in days for the pair, from a dict rebuilt only when supplier_product.csv changes."""
+        sp = csv_cache.load(SUPPLIER_PRODUCT_PATH)
+        if self._lead_times is None or self._lead_times[0] is not sp:
+            pairs = sp.drop_duplicates(["supplier_id", "product_id"])
+            self._lead_times = (sp, dict(zip(
+                zip(pairs["supplier_id"], pairs["product_id"]),
+                pairs["lead_time_days"].astype(int).tolist()
+            )))
+        return self._lead_times[1].get((supplier_id, material_id))
+
     # --------------------------------------------------
     # Receive Good (Update Inventory & Supplier Score)
     # --------------------------------------------------
@@ -148,6 +263,10 @@ class ProcurementService:
         received_quantity = float(payload.get("received_quantity", 0))
         delay_days = float(payload.get("delay_days", 0))
         low_quality = payload.get("low_quality", False)
+
+        now_dt = datetime.now()
+        now_iso = now_dt.isoformat()
+        now_date = now_dt.strftime('%Y-%m-%d')
         
         response_data = {
             "status": "SUCCESS",
@@ -160,51 +279,53 @@ class ProcurementService:
         }
         
         # 1. Update PO Status
-        po_df = pd.read_csv(self.csv_path)
-        mask = po_df["po_id"] == po_id
+        po_row = find_purchase_order(po_id, self.csv_path)
         
-        if mask.sum() == 0:
+        if po_row is None:
             response_data["status"] = "ERROR"
             response_data["message"] = f"PO {po_id} not found"
             return response_data
             
-        po_row = po_df.loc[mask].iloc[0]
         if po_row["status"] != "APPROVED":
             response_data["status"] = "ERROR"
             response_data["message"] = f"Cannot receive PO {po_id} - status is {po_row['status']}"
             return response_data
             
         # Complete the PO
-        po_df.loc[mask, "status"] = "COMPLETED"
-        po_df.to_csv(self.csv_path, index=False)
+        self._append_event(
+            po_id, now_iso, "COMPLETED",
+            po_row["approved_at"], po_row["expected_delivery_date"]
+        )
         
         material_id = po_row["material_id"]
         supplier_id = po_row["selected_supplier"]
-        now = datetime.now().isoformat()
         
         # 2. Update Inventory
         inv_path = "data_base/inventory.csv"
-        inv_df = pd.read_csv(inv_path)
+        inv_df = csv_cache.load(inv_path).copy()
         
         old_stock = 0
-        if material_id in inv_df["product_id"].values:
-            old_stock = inv_df.loc[inv_df["product_id"] == material_id, "current_stock"].iloc[0]
-            inv_df.loc[inv_df["product_id"] == material_id, "current_stock"] += received_quantity
-            inv_df.loc[inv_df["product_id"] == material_id, "last_updated"] = now
+        inv_idx = csv_cache.index(inv_path, "product_id").get(material_id)
+        if inv_idx is not None:
+            old_stock = inv_df.at[inv_idx, "current_stock"]
+            new_stock = old_stock + received_quantity
+            inv_df.at[inv_idx, "current_stock"] = new_stock
+            inv_df.at[inv_idx, "last_updated"] = now_iso
         else:
-            # Create new row if not exists
-            new_inv = pd.DataFrame([{
+            # Create new row if not exists (in place; concat would copy the table)
+            inv_df.loc[len(inv_df)] = {
                 "product_id": material_id,
                 "current_stock": received_quantity,
                 "reserved_stock": 0,
                 "warehouse_location": "WH1",
-                "last_updated": now,
+                "last_updated": now_iso,
                 "inventory_type": "RAW"
-            }])
-            inv_df = pd.concat([inv_df, new_inv], ignore_index=True)
-            
-        new_stock = inv_df.loc[inv_df["product_id"] == material_id, "current_stock"].iloc[0]
-        inv_df.to_csv(inv_path, index=False)
+            }
+            new_stock = received_quantity
+
+        # sync: production_execution_agent reads and writes inventory.csv
+        # directly, so a deferred flush could overwrite its consumption
+        csv_cache.save(inv_path, inv_df, sync=True)
 
         response_data["inventory_update"] = {
             "material_id": material_id,
@@ -215,49 +336,49 @@ class ProcurementService:
         
         # 3. Update Supplier Performance
         perf_path = "data_base/supplier_performance.csv"
-        perf_df = pd.read_csv(perf_path)
+        perf_df = csv_cache.load(perf_path).copy()
         
-        mask_perf = (perf_df["supplier_id"] == supplier_id) & (perf_df["product_id"] == material_id)
+        row_idx = csv_cache.index(perf_path, "supplier_id", "product_id").get((supplier_id, material_id))
         
         old_avg_delay = None
         old_ontime_rate = None
         old_defect_rate = None
 
-        if mask_perf.sum() > 0:
-            row_idx = perf_df[mask_perf].index[0]
-            
-            old_avg_delay = perf_df.loc[row_idx, "average_delay_days"]
-            old_ontime_rate = perf_df.loc[row_idx, "on_time_delivery_rate"]
-            old_defect_rate = perf_df.loc[row_idx, "defect_rate"]
+        if row_idx is not None:
+            old_avg_delay = float(perf_df.at[row_idx, "average_delay_days"])
+            old_ontime_rate = float(perf_df.at[row_idx, "on_time_delivery_rate"])
+            old_defect_rate = float(perf_df.at[row_idx, "defect_rate"])
 
             # Simple exponential moving average update (alpha = 0.2)
             alpha = 0.2
             
             # Update average delay
-            curr_delay = perf_df.loc[row_idx, "average_delay_days"]
-            perf_df.loc[row_idx, "average_delay_days"] = round((curr_delay * (1 - alpha)) + (delay_days * alpha), 2)
+            new_avg_delay = round((old_avg_delay * (1 - alpha)) + (delay_days * alpha), 2)
             
             # Update on-time rate
-            curr_ontime = perf_df.loc[row_idx, "on_time_delivery_rate"]
             is_ontime = 1.0 if delay_days <= 0 else 0.0
-            perf_df.loc[row_idx, "on_time_delivery_rate"] = round((curr_ontime * (1 - alpha)) + (is_ontime * alpha), 3)
+            new_ontime_rate = round((old_ontime_rate * (1 - alpha)) + (is_ontime * alpha), 3)
             
             # Update defect rate
-            curr_defect = perf_df.loc[row_idx, "defect_rate"]
             is_defect = 1.0 if low_quality else 0.0
-            perf_df.loc[row_idx, "defect_rate"] = round((curr_defect * (1 - alpha)) + (is_defect * alpha), 3)
+            new_defect_rate = round((old_defect_rate * (1 - alpha)) + (is_defect * alpha), 3)
             
-            perf_df.loc[row_idx, "last_updated"] = datetime.today().strftime('%Y-%m-%d')
+            perf_df.at[row_idx, "average_delay_days"] = new_avg_delay
+            perf_df.at[row_idx, "on_time_delivery_rate"] = new_ontime_rate
+            perf_df.at[row_idx, "defect_rate"] = new_defect_rate
+            perf_df.at[row_idx, "last_updated"] = now_date
             
-            perf_df.to_csv(perf_path, index=False)
+            # Deferred: only this service writes it; SupplierAgent's direct
+            # read picks the update up after the next flush
+            csv_cache.save(perf_path, perf_df)
             logger.info(f"Updated supplier performance for {supplier_id} on {material_id}")
 
             response_data["supplier_performance_update"] = {
                 "supplier_id": supplier_id,
                 "material_id": material_id,
-                "average_delay_days": {"before": old_avg_delay, "after": perf_df.loc[row_idx, "average_delay_days"]},
-                "on_time_delivery_rate": {"before": old_ontime_rate, "after": perf_df.loc[row_idx, "on_time_delivery_rate"]},
-                "defect_rate": {"before": old_defect_rate, "after": perf_df.loc[row_idx, "defect_rate"]}
+                "average_delay_days": {"before": old_avg_delay, "after": new_avg_delay},
+                "on_time_delivery_rate": {"before": old_ontime_rate, "after": new_ontime_rate},
+                "defect_rate": {"before": old_defect_rate, "after": new_defect_rate}
             }
         else:
             logger.warning(f"Supplier performance record not found for {supplier_id} and {material_id}. No performance update.")
@@ -268,7 +389,7 @@ class ProcurementService:
         master_path = "data_base/supplier_master.csv"
         old_reliability_score = None
         try:
-            master_df = pd.read_csv(master_path)
+            master_df = csv_cache.load(master_path).copy()
             master_df.columns = master_df.columns.str.strip()
             
             # Ensure supplier_id is stripped of whitespace for accurate matching
@@ -303,7 +424,8 @@ class ProcurementService:
                 new_reliability = max(0.01, min(1.00, new_reliability))
                 
                 master_df.loc[idx_master, "reliability_score"] = new_reliability
-                master_df.to_csv(master_path, index=False)
+                # Deferred, like supplier_performance above
+                csv_cache.save(master_path, master_df)
                 logger.info(f"Updated Master Supplier Reliability for {supplier_id}: {curr_reliability} -> {new_reliability}")
 
                 response_data["supplier_master_update"] = {
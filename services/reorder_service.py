@@ -21,10 +21,57 @@ STRICT DESIGN:
 - Inventory dataframe must be passed as input
 """
 
-from typing import Dict, Any
+from dataclasses import dataclass
+from enum import IntEnum
+from typing import Dict, Any, List, Optional
+import numpy as np
 import pandas as pd
 
 
+class Policy(IntEnum):
+    """Small-int policy codes shared by the scalar and array paths."""
+    EOQ = 0
+    TARGET_LEVEL = 1
+    FIXED_LOT = 2
+
+
+@dataclass(slots=True)
+class ReorderEvent:
+    """Reorder decision for one material (slotted: no per-event dict)."""
+    material_id: str
+    warehouse_location: str
+    available_stock: float
+    reorder_point: float
+    reorder_trigger: bool
+    policy_used: Optional[str] = None
+    recommended_order_quantity: Optional[float] = None
+    supplier_decision: Optional[Dict[str, Any]] = None
+    llm_reasoning: Optional[Dict[str, Any]] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON payload; the order fields are only present when triggered."""
+        payload = {
+            "material_id": self.material_id,
+            "warehouse_location": self.warehouse_location,
+            "available_stock": self.available_stock,
+            "reorder_point": self.reorder_point,
+            "reorder_trigger": self.reorder_trigger
+        }
+
+        if self.reorder_trigger:
+            payload.update({
+                "policy_used": self.policy_used,
+                "recommended_order_quantity": self.recommended_order_quantity,
+                "supplier_decision": self.supplier_decision,
+                "llm_reasoning": self.llm_reasoning
+            })
+
+        return payload
+
+
+_DEMAND_KEYS = ("average_daily_demand", "lead_time_days", "safety_stock")
+
+
 class ReorderServiceException(Exception):
     """Base exception for ReorderService errors."""
     pass
@@ -40,6 +87,23 @@ class InvalidPolicyException(ReorderServiceException):
     pass
 
 
+def policy_code(policy_config: Dict[str, Any]) -> Policy:
+    """
+    Policy for policy_config["policy_type"]. Validated on first use and
+    cached on the config as "_code", so later calls skip the string lookup;
+    call it when loading configs to surface bad policies early.
+    """
+    code = policy_config.get("_code")
+    if code is None:
+        policy_type = policy_config["policy_type"]
+        try:
+            code = Policy[policy_type]
+        except KeyError:
+            raise InvalidPolicyException(f"Unsupported policy type: {policy_type}")
+        policy_config["_code"] = code
+    return code
+
+
 class ReorderService:
     """
     Enterprise Reorder Service
@@ -48,7 +112,28 @@ class ReorderService:
     """
 
     def __init__(self):
-        pass
+        # Lookup structures for the inventory frame last seen (bind_inventory)
+        self._inventory_df: Optional[pd.DataFrame] = None
+        self._index: Dict[str, int] = {}
+        self._columns: Dict[str, Any] = {}
+
+    def bind_inventory(self, inventory_df: pd.DataFrame) -> None:
+        """
+        Index inventory_df by product_id so row lookups are a dict hit.
+        Called automatically when a different frame is passed in; call it
+        again after mutating the bound frame in place.
+        """
+        index: Dict[str, int] = {}
+        for i, product_id in enumerate(inventory_df["product_id"].to_numpy()):
+            index.setdefault(product_id, i)  # first row wins, as with .iloc[0]
+
+        self._columns = {
+            col: inventory_df[col].to_numpy()
+            for col in ("current_stock", "reserved_stock", "warehouse_location")
+            if col in inventory_df.columns
+        }
+        self._index = index
+        self._inventory_df = inventory_df
 
 
     # ---------------------------------------------------------
@@ -61,11 +146,11 @@ class ReorderService:
         product_id: str,
         demand_params: Dict[str, Any],
         policy_config: Dict[str, Any]
-    ) -> Dict[str, Any]:
+    ) -> ReorderEvent:
         """
         Event-driven entry method triggered after inventory update.
 
-        :return: Structured decision payload
+        :return: Structured decision event
         """
 
         product_row = self._get_product_row(inventory_df, product_id)
@@ -101,11 +186,97 @@ class ReorderService:
         )
 
 
+    def handle_inventory_update_batch(
+        self,
+        inventory_df: pd.DataFrame,
+        product_ids: List[str],
+        demand_config: Dict[str, Dict[str, Any]],
+        policy_config: Dict[str, Dict[str, Any]]
+    ) -> List[ReorderEvent]:
+        """
+        handle_inventory_update() for several products at once. The reorder
+        math runs over float64 arrays (see reorder_arrays) instead of once
+        per product in Python.
+
+        :return: One decision event per product_id, in the same order
+        """
+
+        if not product_ids:
+            return []
+
+        if inventory_df is not self._inventory_df:
+            self.bind_inventory(inventory_df)
+
+        rows = []
+        for product_id in product_ids:
+            i = self._index.get(product_id)
+            if i is None:
+                raise InvalidProductException(
+                    f"Product ID {product_id} not found in inventory."
+                )
+            rows.append(i)
+        rows = np.asarray(rows)
+
+        demand = [demand_config[pid] for pid in product_ids]
+        policy = [policy_config[pid] for pid in product_ids]
+
+        codes = np.array([policy_code(p) for p in policy], dtype=np.int8)
+        policy_types = [p["policy_type"] for p in policy]
+
+        def column(params, key):
+            # Required like in the scalar path: a missing key raises KeyError
+            return np.array([p[key] for p in params], dtype=np.float64)
+
+        def policy_column(key, code):
+            # Only rows of that policy need the key; the rest are never read
+            return np.array(
+                [p[key] if c == code else np.nan for p, c in zip(policy, codes)],
+                dtype=np.float64
+            )
+
+        available, reorder_point, quantity, trigger = reorder_arrays(
+            average_daily_demand=column(demand, "average_daily_demand"),
+            lead_time_days=column(demand, "lead_time_days"),
+            safety_stock=column(demand, "safety_stock"),
+            current_stock=self._columns["current_stock"][rows].astype(np.float64),
+            reserved_stock=self._columns["reserved_stock"][rows].astype(np.float64),
+            policy_code=codes,
+            economic_order_quantity=policy_column("economic_order_quantity", Policy.EOQ),
+            target_level=policy_column("target_level", Policy.TARGET_LEVEL),
+            fixed_lot_size=policy_column("fixed_lot_size", Policy.FIXED_LOT)
+        )
+
+        # Integer demand inputs gave an int reorder point on the scalar path
+        reorder_point = [
+            int(rp) if all(isinstance(d[k], (int, np.integer)) for k in _DEMAND_KEYS) else rp
+            for rp, d in zip(reorder_point.tolist(), demand)
+        ]
+
+        locations = self._columns.get("warehouse_location")
+        locations = locations[rows].tolist() if locations is not None else ["WH1"] * len(rows)
+
+        return [
+            self.generate_event_payload(
+                product_id=product_id,
+                warehouse_location=location,
+                available_stock=avail,
+                reorder_point=rp,
+                reorder_trigger=trig,
+                policy_used=policy_type if trig else None,
+                recommended_order_quantity=qty if trig else None
+            )
+            for product_id, location, avail, rp, qty, trig, policy_type in zip(
+                product_ids, locations, available.tolist(), reorder_point,
+                quantity.tolist(), trigger.tolist(), policy_types
+            )
+        ]
+
+
     # ---------------------------------------------------------
     # CORE CALCULATIONS
     # ---------------------------------------------------------
 
-    def calculate_available_stock(self, product_row: pd.Series) -> float:
+    def calculate_available_stock(self, product_row: Dict[str, Any]) -> float:
         """Calculate available stock."""
         return float(product_row["current_stock"] - product_row["reserved_stock"])
 
@@ -127,19 +298,16 @@ class ReorderService:
     ) -> float:
         """Determine order quantity based on selected policy."""
 
-        policy = policy_config["policy_type"]
+        code = policy_code(policy_config)
 
-        if policy == "EOQ":
+        if code == Policy.EOQ:
             return float(policy_config["economic_order_quantity"])
 
-        if policy == "TARGET_LEVEL":
+        if code == Policy.TARGET_LEVEL:
             target_level = policy_config["target_level"]
             return max(0.0, target_level - available_stock)
 
-        if policy == "FIXED_LOT":
-            return float(policy_config["fixed_lot_size"])
-
-        raise InvalidPolicyException(f"Unsupported policy type: {policy}")
+        return float(policy_config["fixed_lot_size"])
 
     def evaluate_reorder(
         self,
@@ -164,28 +332,20 @@ class ReorderService:
         recommended_order_quantity: float = None,
         supplier_decision: Dict[str, Any] = None,
         llm_reasoning: Dict[str, Any] = None
-    ) -> Dict[str, Any]:
-        """Generate structured event payload."""
-
-        base_payload = {
-            "material_id": product_id,
-            "warehouse_location": warehouse_location,
-            "available_stock": available_stock,
-            "reorder_point": reorder_point,
-            "reorder_trigger": reorder_trigger
-        }
+    ) -> ReorderEvent:
+        """Generate structured event; ReorderEvent.to_dict() for JSON."""
 
         if not reorder_trigger:
-            return base_payload
-
-        base_payload.update({
-            "policy_used": policy_used,
-            "recommended_order_quantity": recommended_order_quantity,
-            "supplier_decision": supplier_decision,
-            "llm_reasoning": llm_reasoning
-        })
+            return ReorderEvent(
+                product_id, warehouse_location, available_stock,
+                reorder_point, reorder_trigger
+            )
 
-        return base_payload
+        return ReorderEvent(
+            product_id, warehouse_location, available_stock,
+            reorder_point, reorder_trigger, policy_used,
+            recommended_order_quantity, supplier_decision, llm_reasoning
+        )
 
     # ---------------------------------------------------------
     # INTERNAL UTILITIES
@@ -195,14 +355,54 @@ class ReorderService:
         self,
         inventory_df: pd.DataFrame,
         product_id: str
-    ) -> pd.Series:
-        """Fetch product row from inventory dataframe."""
+    ) -> Dict[str, Any]:
+        """Fetch the product's inventory fields as a plain dict."""
+
+        if inventory_df is not self._inventory_df:
+            self.bind_inventory(inventory_df)
 
-        product_rows = inventory_df[inventory_df["product_id"] == product_id]
+        i = self._index.get(product_id)
 
-        if product_rows.empty:
+        if i is None:
             raise InvalidProductException(
                 f"Product ID {product_id} not found in inventory."
             )
 
-        return product_rows.iloc[0]
+        return {col: values[i] for col, values in self._columns.items()}
+
+
+def reorder_arrays(
+    average_daily_demand: np.ndarray,
+    lead_time_days: np.ndarray,
+    safety_stock: np.ndarray,
+    current_stock: np.ndarray,
+    reserved_stock: np.ndarray,
+    policy_code: np.ndarray,
+    economic_order_quantity: np.ndarray,
+    target_level: np.ndarray,
+    fixed_lot_size: np.ndarray
+):
+    """
+    Array form of the reorder math: the same formulas as the scalar
+    calculate_* / evaluate_reorder methods, one element per product.
+
+    :return: (available_stock, reorder_point, order_quantity, reorder_trigger)
+    """
+
+    available = current_stock - reserved_stock
+    reorder_point = average_daily_demand * lead_time_days
+    reorder_point += safety_stock
+
+    # Fill each policy's rows from its own formula; nested np.where would
+    # evaluate every formula for every row
+    quantity = np.empty_like(available)
+    eoq = policy_code == Policy.EOQ
+    target = policy_code == Policy.TARGET_LEVEL
+    fixed = policy_code == Policy.FIXED_LOT
+    quantity[eoq] = economic_order_quantity[eoq]
+    quantity[target] = np.maximum(0.0, target_level[target] - available[target])
+    quantity[fixed] = fixed_lot_size[fixed]
+
+    trigger = available <= reorder_point
+
+    return available, reorder_point, quantity, trigger
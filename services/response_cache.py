@@ -0,0 +1,62 @@
+"""
+response_cache.py — in-process TTL cache for LLM-backed endpoint responses
+
+Gemini answers are slow and billed per call, while the same question is
+often asked again before the underlying CSVs change. Keys combine the
+request (prompt / action) with the mtimes of the files the agent builds its
+state from, so any write to those files misses the cache on its own.
+"""
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+
+
+class TTLCache:
+    """Bounded LRU map whose entries expire ttl seconds after being set."""
+
+    def __init__(self, maxsize: int = 512, ttl: float = 300):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            expires, value = item
+            if expires <= time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value) -> None:
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+
+def files_stamp(base: str, names) -> tuple:
+    """mtime_ns of each named file under base (0 if missing)."""
+    stamp = []
+    for name in names:
+        try:
+            stamp.append(os.stat(os.path.join(base, name)).st_mtime_ns)
+        except OSError:
+            stamp.append(0)
+    return tuple(stamp)
+
+
+def make_key(*parts) -> str:
+    """Fixed-size blake2b digest of parts, for use as a cache key."""
+    h = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        h.update(repr(part).encode())
+        h.update(b"\x00")
+    return h.hexdigest()
@@ -1,97 +1,166 @@
 """
 warehouse_service.py  — Business logic for warehouse insights
 """
-import os, pandas as pd
+import os, numpy as np, pandas as pd
 from datetime import datetime
+from typing import NamedTuple
+from services import csv_cache
 
 BASE = os.path.join(os.path.dirname(__file__), "..", "data_base")
 
+# Column types per file, cast once per file version instead of per request.
+# Stock stays float64: the values are echoed as-is in the JSON responses.
+_SCHEMAS = {
+    "warehouse.csv": {"max_capacity": "float64"},
+    "inventory.csv": {"current_stock": "float64", "reserved_stock": "float64"},
+    "wip_tracking.csv": {"quantity": "int32", "status": "category",
+                         "last_updated": "datetime64[ns]"},
+}
+
 def _read(fname):
+    # Shared per file version: read-only, see _read_fg for the one we mutate
     try:
-        return pd.read_csv(os.path.join(BASE, fname))
+        return csv_cache.typed(os.path.join(BASE, fname), _SCHEMAS.get(fname, {}))
     except Exception:
         return pd.DataFrame()
 
+def _read_fg():
+    # _fg_stock coerces current_stock in place, so take a private copy
+    return _read("finished_goods_inventory.csv").copy()
+
+class WhView(NamedTuple):
+    """warehouse.csv as column arrays; empty arrays if the file is missing."""
+    warehouse_id: np.ndarray
+    max_capacity: np.ndarray
+
+class InvView(NamedTuple):
+    """inventory.csv as column arrays: text columns hold str, stock float."""
+    product_id: np.ndarray
+    current_stock: np.ndarray
+    reserved_stock: np.ndarray
+    warehouse_location: np.ndarray
+    inventory_type: np.ndarray
+    last_updated: np.ndarray
+
+def _num(df, column):
+    """column as a float array, zeros if the column is absent."""
+    if column not in df.columns:
+        return np.zeros(len(df))
+    return df[column].to_numpy(dtype=float)
+
+def _text(df, column, default):
+    """column as a str array (str() of each cell, so blanks are "nan"), or default if absent."""
+    if column not in df.columns:
+        return np.full(len(df), default, dtype=object)
+    return df[column].to_numpy(dtype=object).astype(str).astype(object)
+
+def _wh_view(wh):
+    return WhView(_text(wh, "warehouse_id", ""), _num(wh, "max_capacity"))
+
+def _inv_view(inv):
+    return InvView(_text(inv, "product_id", ""), _num(inv, "current_stock"),
+                   _num(inv, "reserved_stock"), _text(inv, "warehouse_location", ""),
+                   _text(inv, "inventory_type", "RAW"), _text(inv, "last_updated", ""))
+
+def _now():
+    """generated_at stamp; taken once per report request."""
+    return datetime.utcnow().isoformat()
+
+def _load_all():
+    """(wh, inv, fgi, wip) for building several reports, each file read once."""
+    return (_wh_view(_read("warehouse.csv")), _inv_view(_read("inventory.csv")),
+            _read_fg(), _read("wip_tracking.csv"))
+
+def _raw_by_wh(inv):
+    """Raw stock per warehouse_location, indexed by location string."""
+    return pd.Series(inv.current_stock).groupby(inv.warehouse_location).sum()
+
+def _fg_stock(fgi):
+    """Coerce fgi's current_stock in place and return its total."""
+    if fgi.empty or "current_stock" not in fgi.columns:
+        return 0.0
+    fgi["current_stock"] = pd.to_numeric(fgi["current_stock"], errors="coerce").fillna(0)
+    return fgi["current_stock"].sum()
+
 def get_capacity_overview():
-    wh = _read("warehouse.csv")
-    inv = _read("inventory.csv")
-    fgi = _read("finished_goods_inventory.csv")
-
-    warehouses, total_max, total_used = [], 0, 0
-
-    if not wh.empty:
-        wh["max_capacity"] = pd.to_numeric(wh["max_capacity"], errors="coerce").fillna(0)
-        raw_by_wh = {}
-        if not inv.empty and "warehouse_location" in inv.columns:
-            inv["current_stock"] = pd.to_numeric(inv["current_stock"], errors="coerce").fillna(0)
-            raw_by_wh = inv.groupby("warehouse_location")["current_stock"].sum().to_dict()
-        fg_total = 0.0
-        if not fgi.empty and "current_stock" in fgi.columns:
-            fg_total = pd.to_numeric(fgi["current_stock"], errors="coerce").fillna(0).sum()
-
-        for _, row in wh.iterrows():
-            wid = str(row["warehouse_id"])
-            max_cap = float(row["max_capacity"])
-            occupied = raw_by_wh.get(wid, 0.0) + (fg_total if wid == "WH1" else 0.0)
-            free = max(0.0, max_cap - occupied)
-            pct = round(occupied / max_cap * 100, 1) if max_cap > 0 else 0.0
-            warehouses.append({
-                "warehouse_id": wid, "max_capacity": int(max_cap),
-                "occupied": float(round(occupied, 1)), "free": float(round(free, 1)),
-                "utilization_pct": float(pct), "alert": bool(pct >= 90),
-                "status": "CRITICAL" if pct >= 90 else "WARNING" if pct >= 75 else "NORMAL",
-            })
-            total_max += max_cap; total_used += occupied
+    return _capacity(_wh_view(_read("warehouse.csv")), _raw_by_wh(_inv_view(_read("inventory.csv"))),
+                     _fg_stock(_read_fg()), _now())
+
+def _capacity(wh, raw_by_wh, fg_total, now):
+    # Empty views give empty arrays, so no emptiness guards are needed
+    wid, max_cap = wh.warehouse_id, wh.max_capacity
+    # Align stock totals to warehouses with an index join, no dict round-trip
+    occupied = raw_by_wh.reindex(wid, fill_value=0.0).to_numpy(dtype=float) \
+        + np.where(wid == "WH1", fg_total, 0.0)
+    free = np.clip(max_cap - occupied, 0.0, None)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        pct = np.where(max_cap > 0, np.round(occupied / max_cap * 100, 1), 0.0)
+    warehouses = pd.DataFrame({
+        "warehouse_id": wid, "max_capacity": max_cap.astype(int),
+        "occupied": np.round(occupied, 1), "free": np.round(free, 1),
+        "utilization_pct": pct, "alert": pct >= 90,
+        "status": np.select([pct >= 90, pct >= 75], ["CRITICAL", "WARNING"], "NORMAL"),
+    }).to_dict(orient="records")
+    total_max = float(max_cap.sum()); total_used = float(occupied.sum())
 
     overall_pct = float(round(total_used / total_max * 100, 1)) if total_max > 0 else 0.0
     return {
         "warehouses": warehouses,
         "totals": {"max_capacity": int(total_max), "occupied": float(round(total_used, 1)),
                    "free": float(round(max(0, total_max - total_used), 1)), "utilization_pct": overall_pct},
-        "generated_at": datetime.utcnow().isoformat(),
+        "generated_at": now,
     }
 
 def get_inventory_breakdown():
-    inv = _read("inventory.csv")
-    if inv.empty:
+    return _inventory(_inv_view(_read("inventory.csv")))
+
+def _inventory(inv):
+    if not len(inv.product_id):
         return {"items": [], "summary": {}}
-    inv["current_stock"] = pd.to_numeric(inv["current_stock"], errors="coerce").fillna(0)
-    inv["reserved_stock"] = pd.to_numeric(inv["reserved_stock"], errors="coerce").fillna(0)
-    items = []
-    for _, row in inv.iterrows():
-        t = float(row["current_stock"]); r = float(row["reserved_stock"])
-        items.append({"product_id": str(row.get("product_id", "")), "current_stock": float(t),
-                      "reserved_stock": float(r), "available_stock": float(round(t - r, 1)),
-                      "warehouse_location": str(row.get("warehouse_location", "")),
-                      "inventory_type": str(row.get("inventory_type", "RAW")),
-                      "last_updated": str(row.get("last_updated", ""))})
+    items = pd.DataFrame({
+        "product_id": inv.product_id, "current_stock": inv.current_stock,
+        "reserved_stock": inv.reserved_stock,
+        "available_stock": np.round(inv.current_stock - inv.reserved_stock, 1),
+        "warehouse_location": inv.warehouse_location, "inventory_type": inv.inventory_type,
+        "last_updated": inv.last_updated,
+    }).to_dict(orient="records")
     return {"items": items, "summary": {"total_skus": len(items),
-            "total_stock": int(inv["current_stock"].sum()), "total_reserved": int(inv["reserved_stock"].sum())}}
+            "total_stock": int(inv.current_stock.sum()), "total_reserved": int(inv.reserved_stock.sum())}}
 
 def get_finished_goods():
-    fgi = _read("finished_goods_inventory.csv")
+    fgi = _read_fg()
+    return _fg(fgi, _fg_stock(fgi))
+
+def _fg(fgi, fg_total):
     if fgi.empty:
         return {"items": [], "total_stock": 0}
-    fgi["current_stock"] = pd.to_numeric(fgi["current_stock"], errors="coerce").fillna(0)
-    return {"items": fgi.to_dict(orient="records"), "total_stock": int(fgi["current_stock"].sum())}
+    return {"items": fgi.to_dict(orient="records"), "total_stock": int(fg_total)}
 
 def get_wip_summary():
-    wip = _read("wip_tracking.csv")
+    return _wip(_read("wip_tracking.csv"))
+
+def _wip(wip):
     if wip.empty:
         return {"productions": [], "summary": {}}
-    wip["quantity"] = pd.to_numeric(wip["quantity"], errors="coerce").fillna(0)
+    # status is categorical (see _SCHEMAS): comparisons run on int codes
     if "last_updated" in wip.columns:
-        wip["last_updated"] = pd.to_datetime(wip["last_updated"], errors="coerce")
-        latest = wip.sort_values("last_updated").groupby("production_id").last().reset_index()
+        ordered = wip.sort_values("last_updated", kind="mergesort")
     else:
-        latest = wip.groupby("production_id").last().reset_index()
+        ordered = wip
+    # Latest row per production, listed by production_id as groupby did
+    latest = ordered.dropna(subset=["production_id"]) \
+        .drop_duplicates("production_id", keep="last") \
+        .sort_values("production_id", kind="mergesort")
+
+    # Stage counts per production in one grouped pass
+    total_by_pid = wip.groupby("production_id").size()
+    done_by_pid = (wip["status"] == "COMPLETED").groupby(wip["production_id"]).sum()
 
     productions = []
     for _, row in latest.iterrows():
         pid = str(row["production_id"])
-        stages_df = wip[wip["production_id"] == pid]
-        done = len(stages_df[stages_df["status"] == "COMPLETED"])
-        total = len(stages_df)
+        done = int(done_by_pid.get(row["production_id"], 0))
+        total = int(total_by_pid.get(row["production_id"], 0))
         productions.append({
             "production_id": pid, "current_stage": str(row.get("stage_name", "")),
             "current_status": str(row.get("status", "")), "quantity": int(row.get("quantity", 0)),
@@ -99,17 +168,23 @@ def get_wip_summary():
             "progress_pct": round(done / total * 100) if total > 0 else 0,
             "last_updated": str(row.get("last_updated", ""))
         })
-    in_prog = [p for p in productions if p["current_status"] == "IN_PROGRESS"]
-    done_p  = [p for p in productions if p["current_status"] == "COMPLETED"]
+    # Count and sum through the categorical codes; no filtered frame copies
+    latest_status = latest["status"].value_counts()
+    in_prog_units = wip.loc[wip["status"] == "IN_PROGRESS", "quantity"].sum()
     return {"productions": productions, "summary": {"total_productions": len(productions),
-            "in_progress": len(in_prog), "completed": len(done_p),
-            "total_units_wip": int(wip[wip["status"] == "IN_PROGRESS"]["quantity"].sum())}}
+            "in_progress": int(latest_status.get("IN_PROGRESS", 0)),
+            "completed": int(latest_status.get("COMPLETED", 0)),
+            "total_units_wip": int(in_prog_units)}}
 
 def get_ai_insights():
-    cap = get_capacity_overview()
-    inv = get_inventory_breakdown()
-    wip = get_wip_summary()
-    fgi = get_finished_goods()
+    # One read per CSV and one timestamp, shared by all four reports
+    wh_df, inv_df, fgi_df, wip_df = _load_all()
+    now = _now()
+    fg_total = _fg_stock(fgi_df)
+    cap = _capacity(wh_df, _raw_by_wh(inv_df), fg_total, now)
+    inv = _inventory(inv_df)
+    wip = _wip(wip_df)
+    fgi = _fg(fgi_df, fg_total)
 
     insights, recommendations, alerts = [], [], []
 
@@ -151,16 +226,22 @@ def get_ai_insights():
 
     return {"health_status": health, "health_color": "green" if health == "OPTIMAL" else "red" if health == "AT RISK" else "yellow",
             "overall_utilization": float(op), "insights": insights, "alerts": alerts,
-            "recommendations": recommendations, "strategy_text": strategy, "generated_at": datetime.utcnow().isoformat()}
+            "recommendations": recommendations, "strategy_text": strategy, "generated_at": now}
 
 
 # ──────────────────────────────────────────────────────
 # AI WAREHOUSE AGENT — Gemini-powered reasoning
 # ──────────────────────────────────────────────────────
 
+# ── lazy singleton ────────────────────────────────────
+_agent = None
+
 def _get_agent():
-    from agents.warehouse_agent import WarehouseAgent
-    return WarehouseAgent()
+    global _agent
+    if _agent is None:
+        from agents.warehouse_agent import WarehouseAgent
+        _agent = WarehouseAgent()
+    return _agent
 
 def run_warehouse_agent():
     """Full warehouse analysis: state → rules → Gemini → decision."""
@@ -173,3 +254,12 @@ def run_order_allocation(order_ids=None):
 def run_reorder_check():
     """Check all materials for reorder needs via Gemini reasoning."""
     return _get_agent().reorder_check()
+
+async def run_warehouse_agent_async():
+    return await _get_agent().analyze_async()
+
+async def run_order_allocation_async(order_ids=None):
+    return await _get_agent().allocate_orders_async(order_ids=order_ids)
+
+async def run_reorder_check_async():
+    return await _get_agent().reorder_check_async()
@@ -1,38 +1,48 @@
+import numpy as np
 import pandas as pd
 supplier_id = "S001"
 delay_days = 2
 low_quality = True
 
+
+def update_reliability(df, idx_map, supplier_ids, delays, low_quality_flags):
+    """
+    Apply quality/delay adjustments to reliability_score for a batch of
+    suppliers in one vectorized pass. idx_map maps supplier_id to row
+    position in df (built once per run).
+    """
+    delays = np.asarray(delays, dtype=float)
+    adj = np.where(low_quality_flags, -0.05, 0.01) + np.where(
+        delays > 0, -np.minimum(0.05, delays * 0.01), np.where(delays < 0, 0.01, 0.0))
+    positions = np.fromiter((idx_map[s] for s in supplier_ids), dtype=np.int64,
+                            count=len(supplier_ids))
+    scores = df["reliability_score"].to_numpy(dtype=float, copy=True)
+    curr = scores[positions]
+    new = np.clip(np.round(curr + adj, 2), 0.01, 1.0)
+    # One scatter write into the column array, then one column assignment
+    scores[positions] = new
+    df["reliability_score"] = scores
+    return curr, new
+
+
 master_path = "data_base/supplier_master.csv"
 master_df = pd.read_csv(master_path)
 master_df.columns = master_df.columns.str.strip()
 master_df['supplier_id'] = master_df['supplier_id'].astype(str).str.strip()
 supplier_id_clean = str(supplier_id).strip()
 
-mask_master = master_df["supplier_id"] == supplier_id_clean
-print(f"Mask sum: {mask_master.sum()}")
+# supplier_id -> row position, first row wins; one hash lookup per update
+idx_map = {}
+for i, sid in enumerate(master_df["supplier_id"].to_numpy()):
+    idx_map.setdefault(sid, i)
+found = supplier_id_clean in idx_map
+print(f"Found: {found}")
 
-if mask_master.sum() > 0:
-    idx_master = master_df[mask_master].index[0]
-    curr_reliability = float(master_df.loc[idx_master, "reliability_score"])
-    
-    score_adjustment = 0.0
-    if low_quality:
-        score_adjustment -= 0.05
-    else:
-        score_adjustment += 0.01  
-        
-    if delay_days > 0:
-        delay_penalty = min(0.05, delay_days * 0.01)
-        score_adjustment -= delay_penalty
-    elif delay_days < 0:
-        score_adjustment += 0.01 
-        
-    new_reliability = round(curr_reliability + score_adjustment, 2)
-    new_reliability = max(0.01, min(1.00, new_reliability))
-    
-    master_df.loc[idx_master, "reliability_score"] = new_reliability
-    print(f"Old: {curr_reliability} New: {new_reliability}")
+if found:
+    old, new = update_reliability(master_df, idx_map, [supplier_id_clean], [delay_days], [low_quality])
+    print(f"Old: {old[0]} New: {new[0]}")
+    # Whole-file rewrite on purpose: other services read this file as CSV,
+    # which has no in-place row update, and it is only a few rows long
     master_df.to_csv(master_path, index=False)
     print("Saved")
 else:
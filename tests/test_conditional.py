@@ -0,0 +1,47 @@
+import pytest
+from flask import Flask, jsonify
+
+from routes.conditional import etag_from
+
+
+@pytest.fixture
+def source(tmp_path):
+    path = tmp_path / "orders.csv"
+    path.write_text("po_id\nPO-1\n", encoding="utf-8")
+    return path
+
+
+@pytest.fixture
+def app(source):
+    app = Flask(__name__)
+    app.config["calls"] = 0
+
+    @app.get("/orders")
+    @etag_from(str(source))
+    def orders():
+        app.config["calls"] += 1
+        return jsonify([])
+
+    return app
+
+
+def test_matching_etag_gets_304_without_running_view(client, app):
+    first = client.get("/orders")
+    assert first.status_code == 200
+    tag = first.headers["ETag"]
+
+    second = client.get("/orders", headers={"If-None-Match": tag})
+    assert second.status_code == 304
+    assert second.headers["ETag"] == tag
+    assert app.config["calls"] == 1
+
+
+def test_etag_changes_when_source_file_is_written(client, app, source):
+    tag = client.get("/orders").headers["ETag"]
+
+    source.write_text("po_id\nPO-1\nPO-2\n", encoding="utf-8")
+
+    response = client.get("/orders", headers={"If-None-Match": tag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != tag
+    assert app.config["calls"] == 2
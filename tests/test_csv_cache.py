@@ -0,0 +1,89 @@
+import pandas as pd
+
+from services import csv_cache
+
+
+def _write(path, text):
+    path.write_text(text, encoding="utf-8")
+
+
+def test_load_reuses_frame_until_file_changes(tmp_path):
+    path = tmp_path / "stock.csv"
+    _write(path, "product_id,current_stock\nC001,10\n")
+
+    first = csv_cache.load(str(path))
+    assert csv_cache.load(str(path)) is first
+
+    _write(path, "product_id,current_stock\nC001,10\nC002,25\n")
+
+    second = csv_cache.load(str(path))
+    assert second is not first
+    assert second["product_id"].tolist() == ["C001", "C002"]
+
+
+def test_typed_index_and_rows_follow_file_version(tmp_path):
+    path = tmp_path / "stock.csv"
+    _write(path, "product_id,current_stock\nC001,10\n")
+    schema = {"current_stock": "float64"}
+
+    assert csv_cache.typed(str(path), schema)["current_stock"].tolist() == [10.0]
+    assert csv_cache.index(str(path), "product_id") == {"C001": 0}
+    assert csv_cache.rows(str(path), ("current_stock",)) == [
+        {"product_id": "C001", "current_stock": 10}
+    ]
+
+    _write(path, "product_id,current_stock\nC002,7.5\nC001,x\n")
+
+    assert csv_cache.typed(str(path), schema)["current_stock"].tolist() == [7.5, 0.0]
+    assert csv_cache.index(str(path), "product_id") == {"C002": 0, "C001": 1}
+    assert csv_cache.rows(str(path), ("current_stock",)) == [
+        {"product_id": "C002", "current_stock": 7.5},
+        {"product_id": "C001", "current_stock": "x"},
+    ]
+
+
+def test_saved_frame_is_served_before_and_after_flush(tmp_path):
+    path = tmp_path / "stock.csv"
+    _write(path, "product_id,current_stock\nC001,10\n")
+    csv_cache.load(str(path))
+
+    df = pd.DataFrame({"product_id": ["C001"], "current_stock": [3]})
+    csv_cache.save(str(path), df)
+    assert csv_cache.load(str(path)) is df
+
+    csv_cache.flush()
+    assert path.read_text(encoding="utf-8").splitlines() == [
+        "product_id,current_stock", "C001,3"
+    ]
+    assert csv_cache.load(str(path)) is df
+
+
+def test_etag_changes_when_a_file_is_written(tmp_path):
+    a = tmp_path / "a.csv"
+    b = tmp_path / "b.csv"
+    _write(a, "x\n1\n")
+    _write(b, "y\n1\n")
+
+    tag = csv_cache.etag(str(a), str(b))
+    assert csv_cache.etag(str(a), str(b)) == tag
+
+    _write(b, "y\n1\n2\n")
+    assert csv_cache.etag(str(a), str(b)) != tag
+
+
+def test_filtered_rebuilds_only_for_new_versions(tmp_path):
+    path = tmp_path / "po.csv"
+    _write(path, "po_id,status\nPO-1,PENDING\n")
+    calls = []
+
+    def build():
+        calls.append(1)
+        return csv_cache.rows(str(path))
+
+    first = csv_cache.filtered((str(path),), ("status", "PENDING"), build)
+    assert csv_cache.filtered((str(path),), ("status", "PENDING"), build) is first
+    assert len(calls) == 1
+
+    _write(path, "po_id,status\nPO-1,PENDING\nPO-2,PENDING\n")
+    assert len(csv_cache.filtered((str(path),), ("status", "PENDING"), build)) == 2
+    assert len(calls) == 2
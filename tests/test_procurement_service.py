@@ -0,0 +1,42 @@
+import pandas as pd
+
+from services import procurement_service
+from services.procurement_service import ProcurementService
+
+
+def _plan(*material_ids):
+    return {"procurement_plan": [
+        {"material_id": m, "selected_supplier": "S1", "quantity_to_order": 10}
+        for m in material_ids
+    ]}
+
+
+def _statuses(service):
+    return {po["po_id"]: po["status"] for po in service.list_purchase_orders()}
+
+
+def test_status_changes_are_logged_then_compacted(tmp_path, monkeypatch):
+    monkeypatch.setattr(procurement_service, "COMPACT_EVERY", 2)
+    service = ProcurementService(str(tmp_path / "purchase_orders.csv"))
+    first, second, third = service.save_procurement_plan(
+        "LOG-1", "PRD-1", _plan("C001", "C002", "C003")
+    )
+
+    assert service.reject_po(first)["status"] == "SUCCESS"
+
+    # Below the threshold: the base table is untouched, the event log has the change
+    assert pd.read_csv(service.csv_path)["status"].tolist() == ["PENDING"] * 3
+    assert pd.read_csv(service.events_path)["po_id"].tolist() == [first]
+    assert _statuses(service) == {first: "REJECTED", second: "PENDING", third: "PENDING"}
+
+    service.reject_po(second)
+
+    # Threshold reached: events folded into the base table, log truncated
+    base = pd.read_csv(service.csv_path).set_index("po_id")["status"].to_dict()
+    assert base == {first: "REJECTED", second: "REJECTED", third: "PENDING"}
+    assert pd.read_csv(service.events_path).empty
+    assert _statuses(service) == base
+
+    assert service.reject_po(first)["status"] == "ERROR"
+    assert service.reject_po(third)["status"] == "SUCCESS"
+    assert _statuses(service)[third] == "REJECTED"
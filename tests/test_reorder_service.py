@@ -0,0 +1,50 @@
+import pandas as pd
+import pytest
+
+from services.reorder_service import InvalidProductException, ReorderService
+
+INVENTORY = pd.DataFrame({
+    "product_id": ["C001", "C002", "C003", "C004", "C005"],
+    "current_stock": [10000, 80, 5, 250, 40],
+    "reserved_stock": [1000, 20, 5, 50, 0],
+    "warehouse_location": ["WH1", "WH1", "WH2", "WH1", "WH3"],
+})
+
+DEMAND = {
+    "C001": {"average_daily_demand": 20, "lead_time_days": 5, "safety_stock": 30},
+    "C002": {"average_daily_demand": 10, "lead_time_days": 7, "safety_stock": 15},
+    "C003": {"average_daily_demand": 5, "lead_time_days": 10, "safety_stock": 20},
+    "C004": {"average_daily_demand": 50.5, "lead_time_days": 5, "safety_stock": 100},
+    "C005": {"average_daily_demand": 8, "lead_time_days": 3, "safety_stock": 25},
+}
+
+POLICY = {
+    "C001": {"policy_type": "EOQ", "economic_order_quantity": 100},
+    "C002": {"policy_type": "EOQ", "economic_order_quantity": 200},
+    "C003": {"policy_type": "TARGET_LEVEL", "target_level": 120},
+    "C004": {"policy_type": "FIXED_LOT", "fixed_lot_size": 300},
+    "C005": {"policy_type": "TARGET_LEVEL", "target_level": 30},
+}
+
+
+def test_batch_matches_scalar_decisions():
+    service = ReorderService()
+    product_ids = ["C004", "C001", "C003", "C005", "C002"]
+
+    batch = service.handle_inventory_update_batch(INVENTORY, product_ids, DEMAND, POLICY)
+    scalar = [
+        service.handle_inventory_update(INVENTORY, pid, DEMAND[pid], POLICY[pid])
+        for pid in product_ids
+    ]
+
+    assert [e.to_dict() for e in batch] == [e.to_dict() for e in scalar]
+    for b, s in zip(batch, scalar):
+        assert type(b.reorder_point) is type(s.reorder_point)
+    assert [e.material_id for e in batch if e.reorder_trigger] == ["C004", "C003", "C005", "C002"]
+
+
+def test_batch_rejects_unknown_product():
+    with pytest.raises(InvalidProductException):
+        ReorderService().handle_inventory_update_batch(
+            INVENTORY, ["C001", "X999"], DEMAND, POLICY
+        )